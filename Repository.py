@@ -227,9 +227,14 @@ output
 
 # standard distribution imports
 from __future__ import print_function
-import os, sys, re, time, uuid, warnings, tarfile, shutil, traceback, inspect
+import os, sys, re, time, uuid, warnings, tarfile, shutil, traceback, inspect, mmap
+import hashlib, threading
 from datetime import datetime
-from functools import wraps
+from functools import wraps, partial
+from contextlib import contextmanager
+from collections import OrderedDict
+from bisect import bisect_left
+from multiprocessing.pool import ThreadPool
 from pprint import pprint
 from distutils.dir_util import copy_tree
 import copy
@@ -254,6 +259,7 @@ if sys.version_info >= (3, 0):
     basestring = str
     def makedirs(name, mode=0o777):
         return os.makedirs(name=name, mode=mode, exist_ok=True)
+    replace_file = os.replace
 else:
     str        = str
     unicode    = unicode
@@ -262,11 +268,166 @@ else:
     basestring = basestring
     def makedirs(name, mode=0o777):
         return os.makedirs(name=name, mode=mode)
+    def replace_file(src, dst):
+        if os.name == 'nt' and os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
 
 # set warnings filter to always
 warnings.simplefilter('always')
 
 
+def get_temporary_path(path):
+    """Get a unique hidden temporary file path in the same directory as path"""
+    dirPath, name = os.path.split(path)
+    return os.path.join(dirPath, '.%s.%s_pyreptmp'%(name, uuid.uuid4().hex))
+
+BUFFERS_SIDECAR  = '.%s_pyrepfilebuffers'  # %s replaces file name and buffers uid
+BUFFERS_UID_SIZE = 32
+
+def get_buffers_path(path, uid=None):
+    """Get the out-of-band buffers sidecar file path of a data file. A
+    sidecar is dumped named after the data file only, then it's renamed
+    to include its uid upon replacing the data file"""
+    dirPath, name = os.path.split(path)
+    if uid is not None:
+        name = '%s.%s'%(name, uid)
+    return os.path.join(dirPath, BUFFERS_SIDECAR%name)
+
+def get_buffers_names(name, entries):
+    """Get data file name uid named buffers sidecars among directory
+    entries names"""
+    prefix = '.%s.'%name
+    suffix = BUFFERS_SIDECAR[3:]
+    size   = len(prefix)+BUFFERS_UID_SIZE+len(suffix)
+    return [e for e in entries if len(e)==size and e.startswith(prefix) and e.endswith(suffix)]
+
+def remove_buffers(path, keep=None):
+    """Remove all uid named buffers sidecars of a data file but keep uid's"""
+    dirPath, name = os.path.split(path)
+    if keep is not None:
+        keep = os.path.basename(get_buffers_path(path, keep))
+    for bname in get_buffers_names(name, os.listdir(dirPath or '.')):
+        if bname != keep:
+            os.remove(os.path.join(dirPath, bname))
+
+def remove_temporary(tmpPath):
+    """Remove a dumped temporary file and its buffers sidecar if any"""
+    for path in (tmpPath, get_buffers_path(tmpPath)):
+        if os.path.isfile(path):
+            os.remove(path)
+
+def replace_buffers(tmpPath, path):
+    """Rename buffers sidecar dumped next to temporary file tmpPath to path
+    sidecar named after its uid. Path current sidecar has another uid and
+    is not touched, so path stays readable until it's replaced by tmpPath.
+    Returns buffers uid or None if tmpPath has no buffers"""
+    tmpBuffers = get_buffers_path(tmpPath)
+    if not os.path.isfile(tmpBuffers):
+        return None
+    with open(tmpBuffers, 'rb') as fd:
+        uid = fd.read(BUFFERS_UID_SIZE).decode('ascii')
+    replace_file(tmpBuffers, get_buffers_path(path, uid))
+    return uid
+
+def atomic_replace_dumped(tmpPath, path, fsync=True):
+    """Replace path by a dumped temporary file along with its buffers
+    sidecar if any. Path former buffers sidecar, if any, must be removed
+    after using remove_buffers. Returns buffers uid or None"""
+    uid = replace_buffers(tmpPath, path)
+    try:
+        atomic_replace(tmpPath, path, fsync=fsync)
+    except:
+        if uid is not None:
+            os.remove(get_buffers_path(path, uid))
+        raise
+    return uid
+
+def fsync_directory(path):
+    """fsync directory entries so a rename in it is durable. Does nothing
+    on systems where directories can't be opened"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(path, os.O_RDONLY|os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def atomic_replace(tmpPath, path, fsync=True):
+    """Replace path by an already written and fsynced temporary file and
+    fsync the containing directory if fsync is True. Readers see either the
+    old or the new file but never a partially written one"""
+    replace_file(tmpPath, path)
+    if fsync:
+        fsync_directory(os.path.dirname(path) or '.')
+
+def accepts_fsync(func):
+    """Get whether a dump function accepts fsync argument. Dump functions
+    stored by older pyrep versions and user defined ones may not"""
+    if isinstance(func, partial):
+        func = func.func
+    code = getattr(func, '__code__', None)
+    return code is not None and 'fsync' in code.co_varnames[:code.co_argcount]
+
+def dump_temporary(dump, path, value, fsync=True):
+    """Call dump function on a temporary file next to path and return the
+    temporary file path. Temporary file is removed upon failure"""
+    tmpPath = get_temporary_path(path)
+    try:
+        if accepts_fsync(dump):
+            dump(path=str(tmpPath), value=value, fsync=fsync)
+        else:
+            dump(path=str(tmpPath), value=value)
+    except:
+        remove_temporary(tmpPath)
+        raise
+    return tmpPath
+
+def atomic_dump(dump, path, value, fsync=True):
+    """Call dump function on a temporary file then atomically move it to path
+    along with its buffers sidecar if any. Returns buffers uid or None"""
+    tmpPath = dump_temporary(dump, path=path, value=value, fsync=fsync)
+    try:
+        uid = atomic_replace_dumped(tmpPath, path, fsync=fsync)
+    except:
+        remove_temporary(tmpPath)
+        raise
+    return uid
+
+def list_directory(path):
+    """List directory entries at once using os.scandir when available.
+    Returns a dictionary of entry name and whether it's a directory or None
+    when directory is not found"""
+    try:
+        if hasattr(os, 'scandir'):
+            entries = {}
+            for entry in os.scandir(path):
+                try:
+                    entries[entry.name] = entry.is_dir()
+                except OSError:
+                    entries[entry.name] = False
+            return entries
+        return dict([(n, os.path.isdir(os.path.join(path,n))) for n in os.listdir(path)])
+    except OSError:
+        return None
+
+def atomic_write(path, data, fsync=True):
+    """Write bytes data to path atomically"""
+    tmpPath = get_temporary_path(path)
+    try:
+        with open(tmpPath, 'wb') as fd:
+            fd.write(data)
+            if fsync:
+                fd.flush()
+                os.fsync(fd.fileno())
+        atomic_replace(tmpPath, path, fsync=fsync)
+    except:
+        if os.path.isfile(tmpPath):
+            os.remove(tmpPath)
+        raise
+
+
 def get_pickling_errors(obj, seen=None):
     """Investigate pickling errors."""
     if seen == None:
@@ -309,7 +470,7 @@ def get_dump_method(dump, protocol=-1):
         except:
             raise Exception("protocol must be an integer >=-1")
         code = """
-def dump(path, value):
+def dump(path, value, fsync=True):
     import os
     try:
         import cPickle as pickle
@@ -317,8 +478,9 @@ def dump(path, value):
         import pickle
     with open(path, 'wb') as fd:
         pickle.dump( value, fd, protocol=%i )
-        fd.flush()
-        os.fsync(fd.fileno())
+        if fsync:
+            fd.flush()
+            os.fsync(fd.fileno())
 """%proto
     elif dump.startswith('dill'):
         if dump == 'dill':
@@ -331,36 +493,43 @@ def dump(path, value):
             except:
                 raise Exception("protocol must be an integer >=-1")
         code = """
-def dump(path, value):
+def dump(path, value, fsync=True):
     import dill, os
     with open(path, 'wb') as fd:
         dill.dump( value, fd, protocol=%i )
-        fd.flush()
-        os.fsync(fd.fileno())
+        if fsync:
+            fd.flush()
+            os.fsync(fd.fileno())
 """%proto
     elif dump == 'json':
         code = """
-def dump(path, value):
+def dump(path, value, fsync=True):
     import json, os
     with open(path, 'wb') as fd:
         json.dump( value,fd, ensure_ascii=True, indent=4 )
-        fd.flush()
-        os.fsync(fd.fileno())
+        if fsync:
+            fd.flush()
+            os.fsync(fd.fileno())
 """
-    elif dump == 'numpy':
+    elif dump in ('numpy','numpy_mmap'):
         code = """
-def dump(path, value):
+def dump(path, value, fsync=True):
     import numpy, os
     with open(path, 'wb') as fd:
         numpy.save(file=fd, arr=value)
-        fd.flush()
-        os.fsync(fd.fileno())
+        if fsync:
+            fd.flush()
+            os.fsync(fd.fileno())
 """
     elif dump == 'numpy_text':
         code = """
-def dump(path, value):
-    import numpy
-    numpy.savetxt(fname=path, X=value, fmt='%.6e')
+def dump(path, value, fsync=True):
+    import numpy, os
+    with open(path, 'wb') as fd:
+        numpy.savetxt(fd, X=value, fmt='%.6e')
+        if fsync:
+            fd.flush()
+            os.fsync(fd.fileno())
 """
     else:
         assert isinstance(dump, basestring), "dump must be None or a string"
@@ -404,6 +573,12 @@ def pull(path):
     with open(path, 'rb') as fd:
         return numpy.load(file=fd)
 
+"""
+    elif pull == 'numpy_mmap':
+        code = """
+def pull(path):
+    import numpy
+    return numpy.load(file=path, mmap_mode='r')
 """
     elif pull == 'numpy_text':
         code = """
@@ -419,6 +594,279 @@ def pull(path):
     return code
 
 
+def fsync_file(fd):
+    """flush and fsync an opened file"""
+    fd.flush()
+    os.fsync(fd.fileno())
+
+def bytes_dump(path, value, fsync=True):
+    """'bytes' serializer dump of a bytes, bytearray or memoryview raw data"""
+    if isinstance(value, memoryview) and not getattr(value, 'contiguous', True):
+        value = value.tobytes()
+    with open(path, 'wb') as fd:
+        fd.write(value)
+        if fsync:
+            fsync_file(fd)
+
+def bytes_pull(path):
+    """'bytes' serializer pull"""
+    with open(path, 'rb') as fd:
+        return fd.read()
+
+def pickle_dump(path, value, fsync=True, protocol=2):
+    """'pickle' serializer dump"""
+    with open(path, 'wb') as fd:
+        pickle.dump( value, fd, protocol=protocol )
+        if fsync:
+            fsync_file(fd)
+
+def pickle_pull(path):
+    """'pickle' serializer pull"""
+    with open(path, 'rb') as fd:
+        return pickle.load( fd )
+
+def pickle5_oob_dump(path, value, fsync=True):
+    """'pickle5_oob' serializer dump. Value is pickled with protocol 5 and
+    its contiguous buffers, as numpy arrays data, are written out-of-band
+    at page aligned offsets of path buffers sidecar file. Sidecar first
+    page holds the uid that is also stored in path header"""
+    assert pickle.HIGHEST_PROTOCOL>=5, "'pickle5_oob' requires pickle protocol 5"
+    buffers = []
+    def buffer_callback(buffer):
+        try:
+            buffers.append(buffer.raw())
+        except BufferError:
+            # non contiguous buffer is pickled in-band
+            return True
+        return False
+    skeleton = pickle.dumps(value, protocol=5, buffer_callback=buffer_callback)
+    # first page holds the uid matching data file to its buffers sidecar
+    header = {'uid':uuid.uuid4().hex.encode('ascii'), 'buffers':[]}
+    offset = mmap.PAGESIZE
+    for buffer in buffers:
+        header['buffers'].append( (offset, buffer.nbytes) )
+        offset += mmap.PAGESIZE*(1+(buffer.nbytes-1)//mmap.PAGESIZE) if buffer.nbytes else 0
+    buffersPath = get_buffers_path(path)
+    try:
+        if len(buffers):
+            with open(buffersPath, 'wb') as fd:
+                fd.write(header['uid'])
+                for (offset, _), buffer in zip(header['buffers'], buffers):
+                    fd.seek(offset)
+                    fd.write(buffer)
+                if fsync:
+                    fsync_file(fd)
+        with open(path, 'wb') as fd:
+            pickle.dump( header, fd, protocol=2 )
+            fd.write(skeleton)
+            if fsync:
+                fsync_file(fd)
+    except:
+        if os.path.isfile(buffersPath):
+            os.remove(buffersPath)
+        raise
+
+def pickle5_oob_pull(path):
+    """'pickle5_oob' serializer pull. Out-of-band buffers are slices of a
+    copy-on-write memory map of the buffers sidecar file, therefore numpy
+    arrays are reconstructed without copying nor reading their data"""
+    assert pickle.HIGHEST_PROTOCOL>=5, "'pickle5_oob' requires pickle protocol 5"
+    with open(path, 'rb') as fd:
+        header   = pickle.load( fd )
+        skeleton = fd.read()
+    buffers = []
+    if len(header['buffers']):
+        buffersPath = get_buffers_path(path, header['uid'].decode('ascii'))
+        if not os.path.isfile(buffersPath):
+            # dumped outside of a repository
+            buffersPath = get_buffers_path(path)
+        with open(buffersPath, 'rb') as fd:
+            mapped = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_COPY)
+        assert mapped[:len(header['uid'])] == header['uid'], "buffers sidecar file of '%s' was replaced"%(path,)
+        view    = memoryview(mapped)
+        buffers = [view[offset:offset+nbytes] for offset, nbytes in header['buffers']]
+    return pickle.loads(skeleton, buffers=buffers)
+
+def dill_dump(path, value, fsync=True, protocol=2):
+    """'dill' serializer dump"""
+    import dill
+    with open(path, 'wb') as fd:
+        dill.dump( value, fd, protocol=protocol )
+        if fsync:
+            fsync_file(fd)
+
+def dill_pull(path):
+    """'dill' serializer pull"""
+    import dill
+    with open(path, 'rb') as fd:
+        return dill.load( fd )
+
+def json_dump(path, value, fsync=True):
+    """'json' serializer dump"""
+    import json
+    with open(path, 'w') as fd:
+        json.dump( value,fd, ensure_ascii=True, indent=4 )
+        if fsync:
+            fsync_file(fd)
+
+def json_pull(path):
+    """'json' serializer pull"""
+    import json
+    with open(path, 'r') as fd:
+        return json.load(fd)
+
+def numpy_dump(path, value, fsync=True):
+    """'numpy' and 'numpy_mmap' serializers dump"""
+    import numpy
+    with open(path, 'wb') as fd:
+        numpy.save(file=fd, arr=value)
+        if fsync:
+            fsync_file(fd)
+
+def numpy_pull(path):
+    """'numpy' serializer pull"""
+    import numpy
+    with open(path, 'rb') as fd:
+        return numpy.load(file=fd)
+
+def numpy_mmap_pull(path):
+    """'numpy_mmap' serializer pull as a read-only numpy.memmap"""
+    import numpy
+    return numpy.load(file=path, mmap_mode='r')
+
+def numpy_text_dump(path, value, fsync=True):
+    """'numpy_text' serializer dump"""
+    import numpy
+    with open(path, 'wb') as fd:
+        numpy.savetxt(fd, X=value, fmt='%.6e')
+        if fsync:
+            fsync_file(fd)
+
+def numpy_text_pull(path):
+    """'numpy_text' serializer pull"""
+    import numpy
+    with open(path, 'rb') as fd:
+        return numpy.loadtxt(fname=fd)
+
+def get_auto_serializer(value):
+    """
+    Get the fastest suitable serializer name for a value type. Used when
+    dumping with dump='auto'.
+
+    :Parameters:
+        #. value (object): The value to dump.
+
+    :Returns:
+        #. name (string): 'bytes' for bytes, bytearray and memoryview,
+           'numpy' for numpy.ndarray not holding python objects and
+           highest protocol pickle for anything else.
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return 'bytes'
+    numpy = sys.modules.get('numpy', None)
+    if numpy is not None and type(value) in (numpy.ndarray, numpy.memmap):
+        if not value.dtype.hasobject:
+            return 'numpy'
+    return 'pickle%i'%pickle.HIGHEST_PROTOCOL
+
+
+class SerializersRegistry(object):
+    """
+    Registry of named dump and pull callables. Files dumped with a
+    registered serializer store its name in their info instead of dump
+    and pull code strings. Built-in 'pickle', 'pickle5_oob', 'dill', 'json',
+    'numpy', 'numpy_mmap', 'numpy_text' and 'bytes' serializers are
+    registered upon initialization. 'pickle' and 'dill' names can be suffixed with a
+    protocol as in 'pickle4'. Registry is thread safe.
+
+    Dump callables are called as dump(path=path, value=value) and can
+    accept an fsync boolean argument. Pull callables are called as
+    pull(path=path) and return the pulled value.
+    """
+    NAME_PATTERN     = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(-?[0-9]+)?$')
+    PROTOCOL_PATTERN = re.compile(r'^(pickle|dill)(-?[0-9]+)$')
+
+    def __init__(self):
+        self.__lock        = threading.Lock()
+        self.__serializers = {}
+        self.__builtins    = ('pickle','pickle5_oob','dill','json','numpy','numpy_mmap','numpy_text','bytes')
+        self.register('pickle', dump=pickle_dump, pull=pickle_pull)
+        self.register('pickle5_oob', dump=pickle5_oob_dump, pull=pickle5_oob_pull)
+        self.register('dill', dump=dill_dump, pull=dill_pull)
+        self.register('json', dump=json_dump, pull=json_pull)
+        self.register('numpy', dump=numpy_dump, pull=numpy_pull)
+        self.register('numpy_mmap', dump=numpy_dump, pull=numpy_mmap_pull)
+        self.register('numpy_text', dump=numpy_text_dump, pull=numpy_text_pull)
+        self.register('bytes', dump=bytes_dump, pull=bytes_pull)
+
+    def __contains__(self, name):
+        return self.get(name, 'pull') is not None
+
+    @property
+    def names(self):
+        """Registered serializers names."""
+        return sorted(self.__serializers)
+
+    def is_name(self, method):
+        """Get whether a dump or pull method string is a serializer name
+        rather than code"""
+        return isinstance(method, basestring) and self.NAME_PATTERN.match(method) is not None
+
+    def register(self, name, dump, pull, replace=False):
+        """
+        Register a serializer.
+
+        :Parameters:
+            #. name (string): Serializer name stored in files info.
+            #. dump (callable): Dump function of (path, value).
+            #. pull (callable): Pull function of (path).
+            #. replace (boolean): Whether to replace an already registered
+               serializer. Built-in serializers can't be replaced.
+        """
+        assert self.is_name(name), "serializer name must be a string made of letters, digits and underscores"
+        assert self.PROTOCOL_PATTERN.match(name) is None, "serializer name '%s' is reserved for pickle and dill protocols"%(name,)
+        assert name != 'auto', "serializer name 'auto' is reserved for automatic serializer selection"
+        assert callable(dump), "dump must be callable"
+        assert callable(pull), "pull must be callable"
+        assert isinstance(replace, bool), "replace must be boolean"
+        with self.__lock:
+            if name in self.__serializers:
+                assert name not in self.__builtins, "built-in serializer '%s' can't be replaced"%(name,)
+                assert replace, "serializer '%s' is already registered, set replace to True"%(name,)
+            self.__serializers[name] = (dump, pull)
+
+    def unregister(self, name):
+        """Unregister a serializer given its name. Built-in serializers
+        can't be unregistered."""
+        assert name not in self.__builtins, "built-in serializer '%s' can't be unregistered"%(name,)
+        with self.__lock:
+            self.__serializers.pop(name, None)
+
+    def get(self, name, kind):
+        """
+        Get a registered serializer dump or pull callable.
+
+        :Parameters:
+            #. name (string): Serializer name.
+            #. kind (string): Either 'dump' or 'pull'.
+
+        :Returns:
+            #. function (None, callable): The callable or None if name is
+               not a registered serializer.
+        """
+        if not self.is_name(name):
+            return None
+        entry = self.__serializers.get(name, None)
+        if entry is not None:
+            return entry[kind == 'pull']
+        match = self.PROTOCOL_PATTERN.match(name)
+        if match is None:
+            return None
+        dump, pull = self.__serializers[match.group(1)]
+        if kind == 'pull':
+            return pull
+        return partial(dump, protocol=int(match.group(2)))
+
 
 def path_required(func):
     """Decorate methods when repository path is required."""
@@ -430,6 +878,14 @@ def path_required(func):
         return func(self, *args, **kwargs)
     return wrapper
 
+def writable_required(func):
+    """Decorate methods altering the repository."""
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        assert not self.readonly, "Repository is loaded in readonly mode, calling '%s' is not allowed"%(func.__name__,)
+        return func(self, *args, **kwargs)
+    return wrapper
+
 
 class InterpreterError(Exception): pass
 
@@ -452,8 +908,376 @@ def my_exec(cmd, name, description):
     raise InterpreterError("%s at line %d of %s: %s" % (error_class, line_number, description, detail))
 
 
+class MethodsCache(object):
+    """
+    Bounded least recently used cache of compiled dump and pull functions.
+    Functions are keyed by a hash of their code string and name, therefore
+    the same code is compiled once instead of at every dump, update and
+    pull call. Cache is thread safe.
+
+    :Parameters:
+        #. maxsize (int): Maximum number of cached functions.
+    """
+    def __init__(self, maxsize=128):
+        self.__lock  = threading.Lock()
+        self.__cache = OrderedDict()
+        self.maxsize = maxsize
+        self.clear()
+
+    def __len__(self):
+        return len(self.__cache)
+
+    @property
+    def maxsize(self):
+        """Maximum number of cached functions."""
+        return self.__maxsize
+
+    @maxsize.setter
+    def maxsize(self, value):
+        assert isinstance(value, int), "maxsize must be integer"
+        assert value>0, "maxsize must be >0"
+        with self.__lock:
+            self.__maxsize = value
+            while len(self.__cache)>value:
+                self.__cache.popitem(last=False)
+
+    @property
+    def hits(self):
+        """Number of times a compiled function was found in cache."""
+        return self.__hits
+
+    @property
+    def misses(self):
+        """Number of times a function had to be compiled."""
+        return self.__misses
+
+    def clear(self):
+        """Clear cached functions and reset hits and misses counters."""
+        with self.__lock:
+            self.__cache.clear()
+            self.__hits   = 0
+            self.__misses = 0
+
+    def get_stats(self):
+        """
+        Get cache stats.
+
+        :Returns:
+            #. stats (dict): Cache 'hits', 'misses', 'size' and 'maxsize'.
+        """
+        return {'hits':self.__hits, 'misses':self.__misses,
+                'size':len(self.__cache), 'maxsize':self.__maxsize}
+
+    def get(self, code, name, description):
+        """
+        Get compiled function from cache or compile it using my_exec.
+
+        :Parameters:
+            #. code (string): The function code string.
+            #. name (string): The function name defined in code.
+            #. description (string): Code description used in errors.
+
+        :Returns:
+            #. function (callable): The compiled function.
+        """
+        assert isinstance(code, basestring), "code must be a string"
+        key = code
+        if not isinstance(key, bytes):
+            key = key.encode('utf-8')
+        key = (hashlib.sha1(key).hexdigest(), name)
+        with self.__lock:
+            func = self.__cache.pop(key, None)
+            if func is not None:
+                self.__hits      += 1
+                self.__cache[key] = func
+                return func
+            self.__misses += 1
+        func = my_exec(code, name=name, description=description)
+        with self.__lock:
+            self.__cache[key] = func
+            while len(self.__cache)>self.__maxsize:
+                self.__cache.popitem(last=False)
+        return func
+
+
+def apply_files_info_record(store, update=None, remove=None):
+    """Set and remove entries of a files info store in place"""
+    if update is not None:
+        store.update(update)
+    for name in remove or []:
+        store.pop(name, None)
+
+def read_files_info(path, state=None):
+    """
+    Read a directory files info store file, a pickled dictionary snapshot
+    followed by pickled (update, remove) records. Reading stops at the
+    first partially written record.
+
+    :Parameters:
+        #. path (string): Store file absolute path.
+        #. state (None, tuple): Already read (store, offset, nrecords) to
+           read the following records only.
+
+    :Returns:
+        #. store (dict): Files info store.
+        #. offset (int): End of last valid record.
+        #. nrecords (int): Number of records after snapshot.
+    """
+    with open(path, 'rb') as fd:
+        if state is None:
+            store    = pickle.load(fd)
+            assert isinstance(store, dict), "files info store '%s' must be a dictionary"%path
+            nrecords = 0
+        else:
+            store, offset, nrecords = state
+            store = dict(store)
+            fd.seek(offset)
+        offset = fd.tell()
+        while True:
+            try:
+                update, remove = pickle.load(fd)
+            except Exception:
+                # end of store or partially written trailing record
+                break
+            apply_files_info_record(store, update=update, remove=remove)
+            offset    = fd.tell()
+            nrecords += 1
+    return store, offset, nrecords
+
+
+class _FilesInfoCache(object):
+    """
+    Bounded least recently used cache of loaded directory files info stores.
+    A store file is a pickled dictionary snapshot followed by appended
+    (update, remove) records, see read_files_info. A cached store is only
+    returned if its file on disk did not change since it was loaded, which
+    is checked using its modification time, size and inode. When only
+    records were appended, only these are read. Cache is thread safe.
+
+    :Parameters:
+        #. maxsize (int): Maximum number of cached stores.
+    """
+    def __init__(self, maxsize=64):
+        self.__lock    = threading.Lock()
+        self.__cache   = OrderedDict()
+        self.__maxsize = maxsize
+
+    def __stat_key(self, path):
+        st = os.stat(path)
+        return (getattr(st, 'st_mtime_ns', st.st_mtime), st.st_size, st.st_ino)
+
+    def __set(self, path, entry):
+        with self.__lock:
+            self.__cache.pop(path, None)
+            self.__cache[path] = entry
+            while len(self.__cache)>self.__maxsize:
+                self.__cache.popitem(last=False)
+
+    def clear(self):
+        """Clear all cached stores."""
+        with self.__lock:
+            self.__cache.clear()
+
+    def put(self, path, store, offset, nrecords):
+        """Cache store as just written to path, offset is the end of its
+        last record and nrecords the number of records after snapshot."""
+        try:
+            key = self.__stat_key(path)
+        except OSError:
+            return
+        self.__set(path, (key, store, offset, nrecords))
+
+    def load(self, path):
+        """
+        Get store loaded from path along with its records state. Returned
+        store must not be altered.
+
+        :Parameters:
+            #. path (string): Store file absolute path.
+
+        :Returns:
+            #. store (dict): Files info store. Empty dictionary is returned
+               when store file is not found.
+            #. offset (None, int): End of last valid record where next
+               record is appended or None when store file is not found.
+            #. nrecords (int): Number of records appended after snapshot.
+        """
+        try:
+            key = self.__stat_key(path)
+        except OSError:
+            with self.__lock:
+                self.__cache.pop(path, None)
+            return {}, None, 0
+        with self.__lock:
+            cached = self.__cache.get(path, None)
+            if cached is not None and cached[0] == key:
+                self.__cache.pop(path)
+                self.__cache[path] = cached
+                return cached[1:]
+        if cached is not None and cached[0][2] == key[2]:
+            # same file, records were appended
+            store, offset, nrecords = read_files_info(path, cached[1:])
+        else:
+            store, offset, nrecords = read_files_info(path)
+        self.__set(path, (key, store, offset, nrecords))
+        return store, offset, nrecords
+
+    def get(self, path):
+        """Get store loaded from path. Returned store must not be altered."""
+        return self.load(path)[0]
+
+_FILES_INFO_CACHE = _FilesInfoCache(maxsize=64)
 
 
+_OPERATION = threading.local()
+
+def get_repository_operation():
+    """Get the Repository operation the calling thread is running or
+    'unknown'. This is the operation locks are acquired for."""
+    return getattr(_OPERATION, 'name', None) or 'unknown'
+
+@contextmanager
+def repository_operation(name):
+    """Set the calling thread Repository operation, unless it is already
+    running one, until the context is exited."""
+    if getattr(_OPERATION, 'name', None) is not None:
+        yield
+        return
+    _OPERATION.name = name
+    try:
+        yield
+    finally:
+        _OPERATION.name = None
+
+def lock_operation(func):
+    """Decorate public methods acquiring locks. The method name is the
+    operation its locks and failed trials are recorded for in lock stats."""
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with repository_operation(func.__name__):
+            return func(self, *args, **kwargs)
+    return wrapper
+
+
+class _LockStats(object):
+    """
+    Lock wait and hold times histograms broken down by operation and lock
+    scope along with lock timeouts and failed trials counters. Histogram
+    counts are for times up to every BUCKETS bound in seconds, last count
+    is for times above the last bound. Stats are thread safe.
+    """
+    BUCKETS = (0.0001, 0.001, 0.01, 0.1, 1, 10)
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Reset all stats."""
+        with self.__lock:
+            self.__wait     = {}
+            self.__hold     = {}
+            self.__timeouts = {}
+            self.__trials   = {}
+
+    def __add(self, times, operation, scope, seconds):
+        stats = times.setdefault(operation, {}).get(scope, None)
+        if stats is None:
+            stats = times[operation][scope] = {'count':0, 'total':0., 'max':0.,
+                                               'histogram':[0]*(len(self.BUCKETS)+1)}
+        stats['count'] += 1
+        stats['total'] += seconds
+        stats['max']    = max(stats['max'], seconds)
+        stats['histogram'][bisect_left(self.BUCKETS, seconds)] += 1
+
+    def add_wait(self, operation, scope, seconds, acquired):
+        """Add lock wait time and count timeout if lock was not acquired."""
+        with self.__lock:
+            self.__add(self.__wait, operation, scope, seconds)
+            if not acquired:
+                timeouts = self.__timeouts.setdefault(operation, {})
+                timeouts[scope] = timeouts.get(scope, 0)+1
+
+    def add_hold(self, operation, scope, seconds):
+        """Add lock hold time."""
+        with self.__lock:
+            self.__add(self.__hold, operation, scope, seconds)
+
+    def add_failed_trial(self, operation):
+        """Count a failed trial of an ntrials loop."""
+        with self.__lock:
+            self.__trials[operation] = self.__trials.get(operation, 0)+1
+
+    def get_stats(self):
+        """Get a deep copy snapshot of all stats."""
+        with self.__lock:
+            return {'buckets':self.BUCKETS,
+                    'wait':copy.deepcopy(self.__wait),
+                    'hold':copy.deepcopy(self.__hold),
+                    'timeouts':copy.deepcopy(self.__timeouts),
+                    'failed_trials':dict(self.__trials)}
+
+
+class _InstrumentedLocker(object):
+    """
+    Locker wrapper recording every acquire_lock wait time and every
+    release_lock hold time into lock stats. Lock scope is 'repository' for
+    the repository path lock, 'directory' for directories locks and 'file'
+    for files and files info stores locks. Operation and scope are only
+    computed when enabled returns True, otherwise locks are directly
+    acquired and released. All other attributes are the wrapped locker
+    ones.
+
+    :Parameters:
+        #. locker (pylocker.ServerLocker): The repository locker.
+        #. path (string): The repository path.
+        #. stats (_LockStats): Where to record lock times.
+        #. enabled (callable): Called upon every acquire_lock to get
+           whether recording is enabled.
+    """
+    def __init__(self, locker, path, stats, enabled):
+        self.__locker  = locker
+        self.__path    = path.rstrip(os.sep)
+        self.__stats   = stats
+        self.__enabled = enabled
+        self.__held    = {}
+
+    def __getattr__(self, name):
+        if name.startswith('_InstrumentedLocker__'):
+            raise AttributeError(name)
+        return getattr(self.__locker, name)
+
+    def __get_scope(self, path):
+        if not isinstance(path, basestring):
+            if not len(path):
+                return 'file'
+            path = path[0]
+        if path.rstrip(os.sep) == self.__path:
+            return 'repository'
+        if os.path.isdir(path):
+            return 'directory'
+        return 'file'
+
+    def acquire_lock(self, path, *args, **kwargs):
+        if not self.__enabled():
+            return self.__locker.acquire_lock(path, *args, **kwargs)
+        operation = get_repository_operation()
+        scope     = self.__get_scope(path)
+        tic       = time.time()
+        acquired, lockId = self.__locker.acquire_lock(path, *args, **kwargs)
+        toc       = time.time()
+        self.__stats.add_wait(operation, scope, toc-tic, acquired)
+        if acquired:
+            self.__held[lockId] = (toc, operation, scope)
+        return acquired, lockId
+
+    def release_lock(self, lockId, *args, **kwargs):
+        held = self.__held.pop(lockId, None) if len(self.__held) else None
+        if held is not None:
+            tic, operation, scope = held
+            self.__stats.add_hold(operation, scope, time.time()-tic)
+        return self.__locker.release_lock(lockId, *args, **kwargs)
+
 
 def copy_tree(src, dst, srcDirDict,
               filAttr=['.%s_pyrepfileinfo','.%s_pyrepfileclass'],
@@ -483,6 +1307,7 @@ def copy_tree(src, dst, srcDirDict,
                 dstp = os.path.join(dst, attr)
                 shutil.copyfile(srcp, dstp)
     # copy files
+    entries = os.listdir(src)
     for f in dirList:
         if isinstance(f, basestring):
             srcp = os.path.join(src, f)
@@ -493,6 +1318,8 @@ def copy_tree(src, dst, srcDirDict,
                 if os.path.isfile(srcp):
                     dstp = os.path.join(dst, attr%f)
                     shutil.copyfile(srcp, dstp)
+            for bname in get_buffers_names(f, entries):
+                shutil.copyfile(os.path.join(src, bname), os.path.join(dst, bname))
             files.append(dstp)
     # copy directories
     for d in dirList:
@@ -507,6 +1334,204 @@ def copy_tree(src, dst, srcDirDict,
 
 
 
+class _TreeIndex(object):
+    """
+    In memory hash index of the repository 'walk_repo' nested list tree.
+    Every tracked directory relative path is mapped to a node holding the
+    directory list as stored in 'walk_repo', the set of its files names and
+    a dictionary of its sub-directories. Lookups are therefore O(depth)
+    instead of scanning every directory list level. All tree mutations must
+    go through this index for 'walk_repo' and the index to stay in sync.
+    Every applied mutation is also kept as a pending journal record until
+    it gets committed to disk. Number of tracked files and directories are
+    counted upon every mutation.
+
+    :Parameters:
+        #. walkRepo (None, list): The repository 'walk_repo' list.
+    """
+    JOURNAL_OPERATIONS = ('add_directory','remove_directory','rename_directory',
+                          'copy_directory','add_file','remove_file')
+
+    def __init__(self, walkRepo=None):
+        if walkRepo is None:
+            walkRepo = []
+        self.reset(walkRepo)
+
+    def __build(self, relPath, dirList):
+        node = {'list':dirList, 'files':set(), 'dirs':{}}
+        self.__nodes[relPath] = node
+        for item in dirList:
+            if isinstance(item, basestring):
+                node['files'].add(item)
+            elif isinstance(item, dict) and len(item)==1:
+                name = list(item)[0]
+                node['dirs'][name] = item
+                self.__build(relPath=os.path.join(relPath,name), dirList=item[name])
+        self.__nfiles += len(node['files'])
+        if len(relPath):
+            self.__ndirs += 1
+
+    def __pop_nodes(self, paths):
+        for path in paths:
+            node = self.__nodes.pop(path)
+            self.__nfiles -= len(node['files'])
+            self.__ndirs  -= 1
+
+    def __subtree(self, relPath):
+        paths = [relPath]
+        for name in self.__nodes[relPath]['dirs']:
+            paths.extend( self.__subtree(os.path.join(relPath,name)) )
+        return paths
+
+    def __get_node(self, relPath):
+        node = self.__nodes.get(relPath, None)
+        assert node is not None, "Repository relative directory '%s' not found"%relPath
+        return node
+
+    @property
+    def walkRepo(self):
+        """The indexed 'walk_repo' list."""
+        return self.__walkRepo
+
+    @property
+    def numberOfFiles(self):
+        """Number of tracked files."""
+        return self.__nfiles
+
+    @property
+    def numberOfDirectories(self):
+        """Number of tracked directories not counting the main one."""
+        return self.__ndirs
+
+    @property
+    def pending(self):
+        """List of applied but not yet committed journal records."""
+        return self.__pending
+
+    def pop_pending(self):
+        """Get and clear pending journal records."""
+        pending, self.__pending = self.__pending, []
+        return pending
+
+    def reset(self, walkRepo):
+        """Reset index given a new 'walk_repo' list."""
+        assert isinstance(walkRepo, list), "walkRepo must be a list"
+        self.__walkRepo = walkRepo
+        self.__nodes    = {}
+        self.__pending  = []
+        self.__nfiles   = 0
+        self.__ndirs    = 0
+        self.__build(relPath='', dirList=walkRepo)
+
+    def apply(self, record):
+        """Apply a journal record (operation, arg1, ...) to the tree."""
+        assert isinstance(record, tuple) and len(record), "journal record must be a non empty tuple"
+        assert record[0] in self.JOURNAL_OPERATIONS, "unknown journal operation '%s'"%(record[0],)
+        getattr(self, record[0])(*record[1:])
+
+    def get_directory(self, relPath):
+        """Get directory list as stored in 'walk_repo' or None if not tracked."""
+        node = self.__nodes.get(relPath, None)
+        if node is None:
+            return None
+        return node['list']
+
+    def get_directory_dict(self, relPath):
+        """Get directory {name:list} dictionary as stored in its parent list
+        or None if not tracked."""
+        parentPath, name = os.path.split(relPath)
+        node = self.__nodes.get(parentPath, None)
+        if node is None or not len(name):
+            return None
+        return node['dirs'].get(name, None)
+
+    def is_directory(self, relPath):
+        """Get whether directory relative path is tracked."""
+        return relPath in self.__nodes
+
+    def is_file(self, relPath):
+        """Get whether file relative path is tracked."""
+        dirPath, name = os.path.split(relPath)
+        node = self.__nodes.get(dirPath, None)
+        if node is None:
+            return False
+        return name in node['files']
+
+    def add_directory(self, relPath):
+        """Track directory given that its parent directory is tracked and
+        return its list."""
+        if relPath in self.__nodes:
+            return self.__nodes[relPath]['list']
+        parentPath, name = os.path.split(relPath)
+        parent = self.__get_node(parentPath)
+        item   = {name:[]}
+        parent['list'].append(item)
+        parent['dirs'][name] = item
+        self.__nodes[relPath] = {'list':item[name], 'files':set(), 'dirs':{}}
+        self.__ndirs += 1
+        self.__pending.append( ('add_directory',relPath) )
+        return item[name]
+
+    def remove_directory(self, relPath):
+        """Untrack directory along with all its files and sub-directories."""
+        assert len(relPath), "Removing main repository directory is not allowed"
+        parentPath, name = os.path.split(relPath)
+        parent = self.__get_node(parentPath)
+        item   = parent['dirs'].pop(name, None)
+        assert item is not None, "Repository relative directory '%s' not found"%relPath
+        parent['list'][:] = [i for i in parent['list'] if i is not item]
+        self.__pop_nodes(self.__subtree(relPath))
+        self.__pending.append( ('remove_directory',relPath) )
+
+    def rename_directory(self, relPath, newName):
+        """Rename tracked directory."""
+        assert len(relPath), "Renaming main repository directory is not allowed"
+        parentPath, name = os.path.split(relPath)
+        parent  = self.__get_node(parentPath)
+        item    = parent['dirs'].get(name, None)
+        assert item is not None, "Repository relative directory '%s' not found"%relPath
+        assert newName not in parent['dirs'], "Repository relative directory '%s' already exist"%os.path.join(parentPath,newName)
+        self.__pop_nodes(self.__subtree(relPath))
+        item[newName] = item.pop(name)
+        parent['dirs'][newName] = parent['dirs'].pop(name)
+        self.__build(relPath=os.path.join(parentPath,newName), dirList=item[newName])
+        self.__pending.append( ('rename_directory',relPath,newName) )
+
+    def copy_directory(self, relPath, newRelPath):
+        """Copy tracked directory tree to a new relative path given that the
+        new path parent directory is tracked."""
+        item = self.get_directory_dict(relPath)
+        assert item is not None, "Repository relative directory '%s' not found"%relPath
+        assert newRelPath not in self.__nodes, "Repository relative directory '%s' already exist"%newRelPath
+        newParentPath, newName = os.path.split(newRelPath)
+        newParent = self.__get_node(newParentPath)
+        newItem   = {newName:copy.deepcopy(item[list(item)[0]])}
+        newParent['list'].append(newItem)
+        newParent['dirs'][newName] = newItem
+        self.__build(relPath=newRelPath, dirList=newItem[newName])
+        self.__pending.append( ('copy_directory',relPath,newRelPath) )
+
+    def add_file(self, relPath):
+        """Track file given that its directory is tracked."""
+        dirPath, name = os.path.split(relPath)
+        node = self.__get_node(dirPath)
+        if name not in node['files']:
+            node['list'].append(name)
+            node['files'].add(name)
+            self.__nfiles += 1
+            self.__pending.append( ('add_file',relPath) )
+
+    def remove_file(self, relPath):
+        """Untrack file."""
+        dirPath, name = os.path.split(relPath)
+        node = self.__get_node(dirPath)
+        assert name in node['files'], "Repository file '%s' not found"%relPath
+        node['files'].remove(name)
+        node['list'].remove(name)
+        self.__nfiles -= 1
+        self.__pending.append( ('remove_file',relPath) )
+
+
 
 class Repository(object):
     """
@@ -531,23 +1556,108 @@ class Repository(object):
            set the lock upon reading or writing to the repository
         #. password (None, string): the locker password to manage the
            repository access. If None, default password is given
+        #. readonly (boolean): Whether to load repository in readonly mode.
+           A readonly repository never starts a locker, refuses all
+           altering calls and pulls files straight from disk using their
+           version stamp as in pull_file optimistic mode. This is meant for
+           many worker processes reading the repository.
+        #. lazy (boolean): Whether to load repository lazily without
+           checking every file and directory on disk. See load_repository.
+        #. durability (string): Which writes are fsynced. See durability
+           property.
+
+    Repository tree mutations are appended to '.pyreprepojournal' journal
+    file next to '.pyreprepo' snapshot. Journal is compacted into a new
+    snapshot every JOURNAL_COMPACTION_SIZE records or upon calling save.
+    Compiled dump and pull methods are shared among all instances in
+    METHODS_CACHE least recently used cache.
+
+    Dump and pull methods are looked up by name in SERIALIZERS registry,
+    see register_serializer. Files dumped with a registered serializer
+    store its name in their info. Any other dump and pull strings are
+    considered code and are stored as is, as are files info dumped by
+    older pyrep versions.
+    Files dumped with 'pickle5_oob' store the large buffers of the value,
+    as numpy arrays data, in a '.%s.%s_pyrepfilebuffers' sidecar file
+    named after the file and a unique id stored in the file header, that is
+    memory mapped upon pulling. A new sidecar never overwrites the current
+    one, the old sidecar is removed after the file is replaced, therefore
+    file and sidecar are replaced atomically. Sidecar file is renamed,
+    copied and removed along with the file and file info 'buffers' holds
+    its unique id or None.
+
+    Files info and class are by default stored next to every file in
+    '.%s_pyrepfileinfo' and '.%s_pyrepfileclass' files. Repositories holding
+    many small files can be created or converted using
+    set_files_info_layout to the 'directory' layout, where all files info
+    and class of a directory are stored in a single '.pyrepfilesinfo' file.
+    Every file info change is appended to that store, which is rewritten
+    whole only once appended changes are twice as many as the directory
+    files.
+
+    Data, info and repository files are never overwritten in place. They
+    are written to a temporary file that is fsynced and renamed over the
+    old one, so readers never see a partially written file.
+
+    Checking repository tree against disk, as in load_repository, verify
+    and get_repository_state, lists every directory once and is
+    distributed over VERIFY_WORKERS threads.
+
+    LOCKING_MODE sets how dump_file locks the repository. In 'repository'
+    mode the repository lock is held for the whole dump, which serializes
+    all dumps. In 'directory' mode data and info are written holding only
+    the file's directory and file locks, and the repository lock is held
+    for the short tree commit only. Therefore dumping into different
+    directories proceeds in parallel. In this mode and if GROUP_COMMIT is
+    True, dumped files are queued in '.pyrepcommitqueue' directory and the
+    repository lock holder commits all queued files with a single tree
+    save, other writers find their files already committed.
+    If DUMP_OUTSIDE_LOCK is True, dump_file serializes the value to a
+    temporary file before acquiring any lock and only renames it and
+    updates the tree holding the locks. Therefore locks hold time does
+    not depend on the dumped value size.
+
+    If LOCK_STATS is True, every lock acquired and released by a
+    Repository instance is timed by operation and scope, see lock_stats.
+    LOCK_STATS can also be set on an instance only.
+
+    Durability sets which writes are fsynced, see durability property.
     """
     DEBUG_PRINT_FAILED_TRIALS = False#True
-
-    def __init__(self, path=None, pickleProtocol=2, timeout=10, password=None):
+    JOURNAL_COMPACTION_SIZE   = 1000
+    VERIFY_WORKERS            = 8
+    LOCKING_MODE              = 'repository'
+    GROUP_COMMIT              = True
+    DUMP_OUTSIDE_LOCK         = False
+    LOCK_STATS                = False
+    DURABILITIES              = ('always', 'commit', 'none')
+    METHODS_CACHE             = MethodsCache(maxsize=128)
+    SERIALIZERS               = SerializersRegistry()
+
+    def __init__(self, path=None, pickleProtocol=2, timeout=10, password=None, readonly=False, lazy=False, durability='always'):
         self.__repoLock  = '.pyreplock'
         self.__repoFile  = '.pyreprepo'
+        self.__repoJournal = '.pyreprepojournal'
         self.__dirInfo   = '.pyrepdirinfo'
         self.__dirLock   = '.pyrepdirlock'
         self.__fileInfo  = '.%s_pyrepfileinfo'  # %s replaces file name
         self.__fileClass = '.%s_pyrepfileclass'  # %s replaces file name
         self.__fileLock  = '.%s_pyrepfilelock'  # %s replaces file name
+        self.__fileTemp  = '.%s_pyreptmp'       # %s replaces file name and unique id
+        self.__fileBuffers = BUFFERS_SIDECAR    # %s replaces file name and buffers uid
+        self.__filesInfo = '.pyrepfilesinfo'    # directory files info layout
+        self.__commitQueue  = '.pyrepcommitqueue' # group commit queue directory
+        self.__commitRecord = '.%s_pyrepcommit'   # %s replaces unique id
         #self.__objectDir = '.%s_pyrepobjectdir' # %s replaces file name
         if password is None:
             password = "pyrep_repository_b@11a"
         assert isinstance(password, basestring), "password must be None or a string"
         self.__password = password
         self.__locker   = None
+        self.__lockStats = _LockStats()
+        self.durability  = durability
+        assert isinstance(readonly, bool), "readonly must be boolean"
+        self.__readonly = readonly
         # set default protocols
         assert isinstance(pickleProtocol, int), "pickleProtocol must be integer"
         assert pickleProtocol>=-1, "pickleProtocol must be >=-1"
@@ -559,24 +1669,22 @@ class Repository(object):
         # if path is not None, load existing repository
         if path is not None:
             assert self.is_repository(path), "given path is not a repository. use create_repository or give a valid repository path"
-            self.load_repository(path)
+            self.load_repository(path, readonly=readonly, lazy=lazy)
 
     def __str__(self):
         if self.__path is None:
             return ""
         string = os.path.normpath(self.__path)
-        reprSt = self.get_repository_state()
         # walk files
         leftAdjust = "  "
-        for fdict in reprSt:
-            fdname = list(fdict)[0]
+        for fdname, kind, (exists, info) in self.iter_repository_state(checkDisk=True):
             if fdname == '':
                 continue
-            if fdict[fdname].get('pyrepfileinfo', False):
+            if kind == 'file' and info:
                 string += "\n"
                 string += leftAdjust
                 string += os.path.basename(fdname)
-            elif fdict[fdname].get('pyrepdirinfo', False):
+            elif kind == 'dir' and info:
                 splitPath = fdname.split(os.sep)
                 leftAdjust = ''.join(['  '*(len(item)>0) for item in splitPath])
                 string += "\n"
@@ -590,20 +1698,24 @@ class Repository(object):
         state = {}
         state.update( self.__dict__ )
         state['_Repository__locker'] = None
+        state['_Repository__index']  = None
+        state['_Repository__lockStats'] = None
         return state
 
     def __setstate__(self, state):
         path   = state['_Repository__path']
         locker = None
-        if path is not None:
-            repoLock   = state['_Repository__repoLock']
-            password   = state['_Repository__password']
-            serverFile = os.path.join(path, repoLock)
-            locker     = FACTORY(key=serverFile, password=password, serverFile=serverFile, autoconnect=False, reconnect=False)
-            locker.start()
-        state['_Repository__locker'] = locker
+        state.setdefault('_Repository__readonly', False)
+        state.setdefault('_Repository__loadTime', None)
+        state.setdefault('_Repository__durability', 'always')
+        state['_Repository__walkRepoStat'] = None
+        state['_Repository__lockStats']    = _LockStats()
+        state['_Repository__locker'] = None
+        state['_Repository__index']  = _TreeIndex(state['_Repository__repo']['walk_repo'])
         # set state
         self.__dict__ = state
+        if path is not None and not self.__readonly:
+            self.__locker = self.__create_locker(path)
 
 
     def __repr__(self):
@@ -614,47 +1726,97 @@ class Repository(object):
         repr += " @%s [%i directories] [%i files] "%(self.__path, ndirs, nfiles)
         return repr
 
-    def __sync_files(self, repoPath, dirs):
+    def __list_directories(self, repoPath, relPaths, layout='file', workers=None):
+        """list repository directories once each using a pool of threads.
+        Returns a dictionary of relative path and (entries, store) where
+        entries is the list_directory result and store is the directory
+        files info store in 'directory' layout"""
+        return dict(self.__iter_directories(repoPath, relPaths, layout=layout, workers=workers))
+
+    def __iter_directories(self, repoPath, relPaths, layout='file', workers=None):
+        """same as __list_directories but yield (relPath, (entries, store))
+        in relPaths order as soon as listed"""
+        if workers is None:
+            workers = self.VERIFY_WORKERS
+        def _list(relPath):
+            dirPath = os.path.join(repoPath, relPath)
+            entries = list_directory(dirPath)
+            store   = None
+            if entries is not None and layout == 'directory' and self.__filesInfo in entries:
+                store = self.__load_files_info(dirPath)
+            return relPath, (entries, store)
+        relPaths = list(relPaths)
+        if workers <= 1 or len(relPaths) <= 1:
+            for relPath in relPaths:
+                yield _list(relPath)
+            return
+        pool = ThreadPool(processes=min(workers, len(relPaths)))
+        try:
+            for result in pool.imap(_list, relPaths):
+                yield result
+        finally:
+            pool.terminate()
+
+    def __sync_files(self, repoPath, dirs, layout='file', workers=None):
         errors  = []
         synched = []
+        # collect all well defined directories and list them at once
+        relPaths = []
+        def _collect(relPath, relDirList):
+            relPaths.append(relPath)
+            for k in relDirList:
+                if isinstance(k, dict) and len(k)==1:
+                    dn = list(k)[0]
+                    if isinstance(dn, basestring) and len(dn):
+                        _collect(os.path.join(relPath, dn), k[dn])
+        _collect('', dirs)
+        listing = self.__list_directories(repoPath, relPaths, layout=layout, workers=workers)
+        # check tree against listing
         def _walk_dir(relPath, relDirList, relSynchedList):
-            if not os.path.isdir(os.path.join(repoPath, relPath)):
-                errors.append("Repository directory '%s' not found on disk"%relPath)
-            else:
-                for k in relDirList:
-                    if isinstance(k, dict):
-                        if len(k)!=1:
-                            errors.append("Repository directory found in '%s' info dict length is not 1"%relPath)
-                            continue
-                        dn = list(k)[0]
-                        if not isinstance(dn, basestring):
-                            errors.append("Repository directory found in '%s' info dict key is not a string"%relPath)
-                            continue
-                        if not len(dn):
-                            errors.append("Repository directory found in '%s' info dict key is an empty string"%relPath)
-                            continue
-                        if not os.path.isfile(os.path.join(repoPath, relPath, self.__dirInfo)):
-                            errors.append("Repository directory info file '%s' not found on disk"%os.path.join(repoPath, relPath, self.__dirInfo))
-                            continue
-                        rp = os.path.join(repoPath, relPath, dn)
-                        rsd = {dn:[]}
-                        relSynchedList.append(rsd)
-                        _walk_dir(relPath=rp, relDirList=k[dn], relSynchedList=rsd[dn])
-                    elif isinstance(k, basestring):
-                        relFilePath = os.path.join(repoPath, relPath, k)
-                        relInfoPath = os.path.join(repoPath, relPath, self.__fileInfo%k)
-                        if not os.path.isfile(relFilePath):
-                            errors.append("Repository file '%s' not found on disk"%relFilePath)
-                            continue
-                        elif not os.path.isfile(relInfoPath):
-                            errors.append("Repository file info file '%s' not found on disk"%relFilePath)
-                            continue
-                        relSynchedList.append(k)
+            entries, store = listing[relPath]
+            for k in relDirList:
+                if isinstance(k, dict):
+                    if len(k)!=1:
+                        errors.append("Repository directory found in '%s' info dict length is not 1"%relPath)
+                        continue
+                    dn = list(k)[0]
+                    if not isinstance(dn, basestring):
+                        errors.append("Repository directory found in '%s' info dict key is not a string"%relPath)
+                        continue
+                    if not len(dn):
+                        errors.append("Repository directory found in '%s' info dict key is an empty string"%relPath)
+                        continue
+                    rp = os.path.join(relPath, dn)
+                    if listing[rp][0] is None:
+                        errors.append("Repository directory '%s' not found on disk"%os.path.join(repoPath, rp))
+                        continue
+                    if listing[rp][0].get(self.__dirInfo, True):
+                        errors.append("Repository directory info file '%s' not found on disk"%os.path.join(repoPath, rp, self.__dirInfo))
+                        continue
+                    rsd = {dn:[]}
+                    relSynchedList.append(rsd)
+                    _walk_dir(relPath=rp, relDirList=k[dn], relSynchedList=rsd[dn])
+                elif isinstance(k, basestring):
+                    relFilePath = os.path.join(repoPath, relPath, k)
+                    if layout == 'directory':
+                        infoOnDisk = store is not None and k in store
                     else:
-                        errors.append("Repository file found in '%s' info dict key is not a string"%relPath)
+                        infoOnDisk = entries.get(self.__fileInfo%k, True) is False
+                    if entries.get(k, True) is not False:
+                        errors.append("Repository file '%s' not found on disk"%relFilePath)
+                        continue
+                    elif not infoOnDisk:
+                        errors.append("Repository file info file '%s' not found on disk"%relFilePath)
                         continue
+                    relSynchedList.append(k)
+                else:
+                    errors.append("Repository file found in '%s' info dict key is not a string"%relPath)
+                    continue
         # call recursive _walk_dir
-        _walk_dir(relPath='', relDirList=dirs, relSynchedList=synched)
+        if listing[''][0] is None:
+            errors.append("Repository directory '%s' not found on disk"%repoPath)
+        else:
+            _walk_dir(relPath='', relDirList=dirs, relSynchedList=synched)
         return synched, errors
 
     #def __setstate__(self, state):
@@ -679,8 +1841,93 @@ class Repository(object):
     def locker(self):
         return self.__locker
 
-    def __save_dirinfo(self, description, dirInfoPath, create=False):
+    @property
+    def durability(self):
+        """Which writes are fsynced to disk. This instance setting can be
+        overriden per operation in dump_file, dump_files and update_file.\n
+        'always': every data, info and repository file is fsynced along
+        with its directory after being renamed.\n
+        'commit': files data and the final repository tree commit are
+        fsynced. Files info and class and directories info are not.\n
+        'none': nothing is fsynced. Writes remain atomic but can be lost
+        upon a system crash. This is meant for scratch repositories."""
+        return self.__durability
+
+    @durability.setter
+    def durability(self, value):
+        assert value in self.DURABILITIES, "durability must be one of %s"%(self.DURABILITIES,)
+        self.__durability = value
+
+    def __get_fsync(self, durability=None):
+        """get files data, info and repository tree commit fsync flags of a
+        durability or this instance durability if None"""
+        if durability is None:
+            durability = self.__durability
+        assert durability in self.DURABILITIES, "durability must be None or one of %s"%(self.DURABILITIES,)
+        return durability != 'none', durability == 'always', durability != 'none'
+
+    def __create_locker(self, repoPath):
+        """create and start repository locker recording lock stats when
+        LOCK_STATS is True"""
+        serverFile = os.path.join(repoPath, self.__repoLock)
+        locker     = FACTORY(key=serverFile, password=self.__password, serverFile=serverFile, autoconnect=False, reconnect=False)
+        locker.start()
+        return _InstrumentedLocker(locker, path=repoPath, stats=self.__lockStats,
+                                   enabled=lambda: self.LOCK_STATS)
+
+    def __failed_trial(self, trial, error):
+        """count failed trial of an ntrials loop in lock stats if LOCK_STATS
+        and print it if DEBUG_PRINT_FAILED_TRIALS"""
+        if not (self.LOCK_STATS or self.DEBUG_PRINT_FAILED_TRIALS):
+            return
+        operation = get_repository_operation()
+        if self.LOCK_STATS: self.__lockStats.add_failed_trial(operation)
+        if self.DEBUG_PRINT_FAILED_TRIALS: print("Trial %i failed in Repository.%s (%s). Set Repository.DEBUG_PRINT_FAILED_TRIALS to False to mute"%(trial, operation, str(error)))
+
+    def lock_stats(self, reset=False):
+        """
+        Get a snapshot of this instance locks stats. When LOCK_STATS is
+        True, every lock acquired and released by this instance is timed.
+        Stats are not recorded by default, as finding every lock operation
+        and scope has a cost.
+
+        :Parameters:
+            #. reset (boolean): Whether to reset stats after taking the
+               snapshot.
+
+        :Returns:
+            #. stats (dict): Locks stats with the following keys\n
+               'wait' and 'hold': {operation:{scope:times}} where operation
+               is the called Repository method, scope is one of 'repository',
+               'directory' and 'file' and times is a dictionary of 'count',
+               'total' and 'max' seconds along with a 'histogram' list of
+               counts for times up to every 'buckets' bound in seconds and
+               above the last bound.\n
+               'timeouts': {operation:{scope:count}} locks not acquired.\n
+               'failed_trials': {operation:count} failed trials of ntrials
+               loops.\n
+               'buckets': histograms bounds in seconds.
+        """
+        assert isinstance(reset, bool), "reset must be boolean"
+        stats = self.__lockStats.get_stats()
+        if reset:
+            self.__lockStats.clear()
+        return stats
+
+    @property
+    def loadTime(self):
+        """Duration in seconds of the last load_repository call or None"""
+        return self.__loadTime
+
+    @property
+    def readonly(self):
+        """Whether repository is loaded in readonly mode"""
+        return self.__readonly
+
+    def __save_dirinfo(self, description, dirInfoPath, create=False, fsync=None):
         # create main directory info file
+        if fsync is None:
+            fsync = self.__get_fsync()[1]
         oldInfo = None
         if description is None and os.path.isfile(dirInfoPath):
             with open(dirInfoPath, 'rb') as fd:
@@ -705,28 +1952,19 @@ class Repository(object):
                     'create_utctime':createTime,
                     'last_update_utctime':lastUpdateTime,
                     'description':description}
-            with open(dirInfoPath, 'wb') as fd:
-                pickle.dump( info,fd, protocol=self._DEFAULT_PICKLE_PROTOCOL )
-                fd.flush()
-                os.fsync(fd.fileno())
+            atomic_write(dirInfoPath, pickle.dumps(info, protocol=self._DEFAULT_PICKLE_PROTOCOL), fsync=fsync)
 
     def __clean_before_after(self, stateBefore, stateAfter, keepNoneEmptyDirectory=True):
-        """clean repository given before and after states"""
+        """clean repository given before and after iter_repository_state
+        states"""
         # prepare after for faster search
-        errors    = []
-        afterDict = {}
-        [afterDict.setdefault(list(aitem)[0],[]).append(aitem) for aitem in stateAfter]
+        errors   = []
+        afterSet = set([(relaPath, btype) for relaPath, btype, _ in stateAfter])
         # loop before
-        for bitem in reversed(stateBefore):
-            relaPath = list(bitem)[0]
+        entries  = {}
+        for relaPath, btype, _ in reversed(stateBefore):
             basename = os.path.basename(relaPath)
-            btype    = bitem[relaPath]['type']
-            alist    = afterDict.get(relaPath, [])
-            aitem    = [a for a in alist if a[relaPath]['type']==btype]
-            if len(aitem)>1:
-                errors.append("Multiple '%s' of type '%s' where found in '%s', this should never had happened. Please report issue"%(basename,btype,relaPath))
-                continue
-            if not len(aitem):
+            if (relaPath, btype) not in afterSet:
                 removeDirs  = []
                 removeFiles = []
                 if btype == 'dir':
@@ -736,10 +1974,17 @@ class Repository(object):
                     removeDirs.append(os.path.join(self.__path,relaPath))
                     removeFiles.append(os.path.join(self.__path,relaPath,self.__dirInfo))
                     removeFiles.append(os.path.join(self.__path,relaPath,self.__dirLock))
+                    removeFiles.append(os.path.join(self.__path,relaPath,self.__filesInfo))
                 elif btype == 'file':
                     removeFiles.append(os.path.join(self.__path,relaPath))
-                    removeFiles.append(os.path.join(self.__path,relaPath,self.__fileInfo%basename))
-                    removeFiles.append(os.path.join(self.__path,relaPath,self.__fileLock%basename))
+                    removeFiles.append(os.path.join(self.__path,os.path.dirname(relaPath),self.__fileInfo%basename))
+                    removeFiles.append(os.path.join(self.__path,os.path.dirname(relaPath),self.__fileClass%basename))
+                    removeFiles.append(os.path.join(self.__path,os.path.dirname(relaPath),self.__fileLock%basename))
+                    dirPath = os.path.join(self.__path,os.path.dirname(relaPath))
+                    if dirPath not in entries:
+                        entries[dirPath] = os.listdir(dirPath) if os.path.isdir(dirPath) else []
+                    for bname in get_buffers_names(basename, entries[dirPath]):
+                        removeFiles.append(os.path.join(dirPath,bname))
                 else:
                     ### MUST VERIFY THAT ONCE pyrepobjectdir IS IMPLEMENTED
                     removeDirs.append(os.path.join(self.__path,relaPath))
@@ -762,6 +2007,139 @@ class Repository(object):
         # return result and errors list
         return len(errors)==0, errors
 
+    def __load_files_info(self, dirPath):
+        """load directory files info store given directory absolute path.
+        Returned dictionary maps file name to (info, pickled class) tuple
+        and must not be altered"""
+        return _FILES_INFO_CACHE.get(os.path.join(dirPath, self.__filesInfo))
+
+    def __save_files_info(self, dirPath, store, fsync=None):
+        """write directory files info store snapshot given directory
+        absolute path"""
+        if fsync is None:
+            fsync = self.__get_fsync()[1]
+        storePath = os.path.join(dirPath, self.__filesInfo)
+        data      = pickle.dumps(store, protocol=self._DEFAULT_PICKLE_PROTOCOL)
+        atomic_write(storePath, data, fsync=fsync)
+        _FILES_INFO_CACHE.put(storePath, store, offset=len(data), nrecords=0)
+
+    def __update_files_info(self, dirPath, update=None, remove=None, fsync=None):
+        """set and remove entries of a directory files info store under
+        the store lock. Changes are appended to the store as a single
+        record, store snapshot is rewritten once records are twice as many
+        as its entries. Therefore a file info write does not depend on the number
+        of files in the directory"""
+        if fsync is None:
+            fsync = self.__get_fsync()[1]
+        storePath = os.path.join(dirPath, self.__filesInfo)
+        acquired, lockId = self.__locker.acquire_lock(path=storePath, timeout=self.timeout)
+        assert acquired, "code %s. Unable to aquire the lock on '%s'"%(lockId, storePath)
+        try:
+            store, offset, nrecords = _FILES_INFO_CACHE.load(storePath)
+            store = dict(store)
+            apply_files_info_record(store, update=update, remove=remove)
+            if offset is None or nrecords >= 2*len(store):
+                self.__save_files_info(dirPath, store, fsync=fsync)
+                return
+            with open(storePath, 'r+b') as fd:
+                # overwrite any partially written trailing record
+                fd.seek(offset)
+                pickle.dump( (update, remove),fd, protocol=self._DEFAULT_PICKLE_PROTOCOL )
+                offset = fd.tell()
+                fd.truncate()
+                if fsync:
+                    fsync_file(fd)
+            _FILES_INFO_CACHE.put(storePath, store, offset=offset, nrecords=nrecords+1)
+        finally:
+            self.__locker.release_lock(lockId)
+
+    def __is_file_info_on_disk(self, relativePath):
+        """get whether file info and file class are stored on disk"""
+        dirPath, name = os.path.split(os.path.join(self.__path, relativePath))
+        if self.__repo.get('files_info_layout', 'file') == 'directory':
+            found = name in self.__load_files_info(dirPath)
+            return found, found
+        infoOnDisk  = os.path.isfile(os.path.join(dirPath,self.__fileInfo%name))
+        classOnDisk = os.path.isfile(os.path.join(dirPath,self.__fileClass%name))
+        return infoOnDisk, classOnDisk
+
+    def __read_file_info(self, relativePath):
+        """read file info dictionary from disk"""
+        dirPath, name = os.path.split(os.path.join(self.__path, relativePath))
+        if self.__repo.get('files_info_layout', 'file') == 'directory':
+            store = self.__load_files_info(dirPath)
+            assert name in store, "file '%s' info is not found in '%s'"%(relativePath, self.__filesInfo)
+            return dict(store[name][0])
+        with open(os.path.join(dirPath,self.__fileInfo%name), 'rb') as fd:
+            info = pickle.load(fd)
+        return info
+
+    def __write_file_info(self, relativePath, info, klass, fsync=None):
+        """write file info dictionary and file class to disk"""
+        if fsync is None:
+            fsync = self.__get_fsync()[1]
+        dirPath, name = os.path.split(os.path.join(self.__path, relativePath))
+        if self.__repo.get('files_info_layout', 'file') == 'directory':
+            klass = pickle.dumps(klass, protocol=self._DEFAULT_PICKLE_PROTOCOL)
+            self.__update_files_info(dirPath, update={name:(info, klass)}, fsync=fsync)
+            return
+        atomic_write(os.path.join(dirPath,self.__fileInfo%name), pickle.dumps(info, protocol=self._DEFAULT_PICKLE_PROTOCOL), fsync=fsync)
+        atomic_write(os.path.join(dirPath,self.__fileClass%name), pickle.dumps(klass, protocol=self._DEFAULT_PICKLE_PROTOCOL), fsync=fsync)
+
+    def __get_file_buffers(self, relativePath):
+        """get file buffers sidecar uid from its info if any"""
+        try:
+            return self.__read_file_info(relativePath).get('buffers', None)
+        except Exception:
+            return None
+
+    def __remove_file_info(self, relativePath):
+        """remove file info, file class and buffers sidecar from disk if existing"""
+        dirPath, name = os.path.split(os.path.join(self.__path, relativePath))
+        if self.__get_file_buffers(relativePath):
+            remove_buffers(os.path.join(dirPath, name))
+        if self.__repo.get('files_info_layout', 'file') == 'directory':
+            if name in self.__load_files_info(dirPath):
+                self.__update_files_info(dirPath, remove=[name])
+            return
+        for path in (os.path.join(dirPath,self.__fileInfo%name), os.path.join(dirPath,self.__fileClass%name)):
+            if os.path.isfile(path):
+                os.remove(path)
+
+    def __copy_file_info(self, relativePath, newRelativePath, move=False):
+        """copy or move file info, file class and buffers sidecar to a new
+        file path"""
+        dirPath, name   = os.path.split(os.path.join(self.__path, relativePath))
+        ndirPath, nname = os.path.split(os.path.join(self.__path, newRelativePath))
+        if self.__get_file_buffers(newRelativePath):
+            remove_buffers(os.path.join(ndirPath, nname))
+        uid = self.__get_file_buffers(relativePath)
+        if isinstance(uid, basestring):
+            buffers  = get_buffers_path(os.path.join(dirPath, name), uid)
+            nbuffers = get_buffers_path(os.path.join(ndirPath, nname), uid)
+            if move:
+                os.rename(buffers, nbuffers)
+            else:
+                shutil.copy(buffers, nbuffers)
+        if self.__repo.get('files_info_layout', 'file') == 'directory':
+            store = self.__load_files_info(dirPath)
+            assert name in store, "file '%s' info is not found in '%s'"%(relativePath, self.__filesInfo)
+            entry = store[name]
+            if move and dirPath == ndirPath:
+                self.__update_files_info(dirPath, update={nname:entry}, remove=[name])
+            else:
+                self.__update_files_info(ndirPath, update={nname:entry})
+                if move:
+                    self.__update_files_info(dirPath, remove=[name])
+            return
+        for pattern in (self.__fileInfo, self.__fileClass):
+            if os.path.isfile(os.path.join(ndirPath,pattern%nname)):
+                os.remove(os.path.join(ndirPath,pattern%nname))
+            if move:
+                os.rename(os.path.join(dirPath,pattern%name), os.path.join(ndirPath,pattern%nname))
+            else:
+                shutil.copy(os.path.join(dirPath,pattern%name), os.path.join(ndirPath,pattern%nname))
+
     #def __set_repository_directory(self, relativePath, dirList):
     #    splitted = self.to_repo_relative_path(path=relativePath, split=True)
     #    if splitted == ['']:
@@ -795,26 +2173,14 @@ class Repository(object):
         return self.__get_repository_directory(relativePath=parentPath)
 
     def __get_repository_directory(self, relativePath):
-        cDir = self.__repo['walk_repo']
-        splitted = self.to_repo_relative_path(path=relativePath, split=True)
-        if splitted == ['']:
-            return cDir
-        for dirname in splitted:
-            dList = [d for d in cDir if isinstance(d, dict)]
-            if not len(dList):
-                cDir = None
-                break
-            cDict = [d for d in dList if dirname in d]
-            if not len(cDict):
-                cDir = None
-                break
-            cDir = cDict[0][dirname]
-        # return
-        return cDir
+        relativePath = self.to_repo_relative_path(path=relativePath, split=False)
+        return self.__index.get_directory(relativePath)
 
-    def __save_repository_pickle_file(self, lockFirst=False, raiseError=True):
+    def __save_repository_pickle_file(self, lockFirst=False, raiseError=True, fsync=None):
         # create and acquire lock
         error = None
+        if fsync is None:
+            fsync = self.__get_fsync()[2]
         if lockFirst:
             acquired, lockId = self.__locker.acquire_lock(path=self.__path, timeout=self.timeout)
             # check if acquired.
@@ -824,12 +2190,20 @@ class Repository(object):
                 return False,error
         try:
             repoInfoPath = os.path.join(self.__path, self.__repoFile)
-            with open(repoInfoPath, 'wb') as fd:
-                self.__repo["last_update_utctime"] = time.time()
-                pickle.dump( self.__repo,fd, protocol=self._DEFAULT_PICKLE_PROTOCOL )
-                fd.flush()
-                os.fsync(fd.fileno())
+            journalPath  = os.path.join(self.__path, self.__repoJournal)
+            journalUid   = str(uuid.uuid1())
+            self.__repo["last_update_utctime"] = time.time()
+            self.__repo["journal_uid"]         = journalUid
+            atomic_write(repoInfoPath, pickle.dumps(self.__repo, protocol=self._DEFAULT_PICKLE_PROTOCOL), fsync=fsync)
+            # reset journal
+            header = pickle.dumps({'journal_uid':journalUid}, protocol=self._DEFAULT_PICKLE_PROTOCOL)
+            atomic_write(journalPath, header, fsync=fsync)
+            offset = len(header)
+            self.__index.pop_pending()
+            self.__journalState = (journalUid, offset, 0)
+            self.__walkRepoStat = self.__get_walk_repo_stat(self.__path)
         except Exception as err:
+            self.__walkRepoStat = None
             error = "Unable to save repository (%s)"%str(err)
         # release lock
         if lockFirst:
@@ -838,14 +2212,129 @@ class Repository(object):
         assert error is None or not raiseError, error
         return error is None, error
 
+    def __get_journal_uid(self, journalPath):
+        try:
+            with open(journalPath, 'rb') as fd:
+                header = pickle.load(fd)
+            return header['journal_uid']
+        except:
+            return None
+
+    def __replay_journal(self, journalPath, index, offset=None):
+        """replay journal records on index starting from offset or right
+        after journal header if offset is None. Returns new offset and number
+        of replayed records"""
+        nrecords = 0
+        with open(journalPath, 'rb') as fd:
+            if offset is None:
+                pickle.load(fd)
+            else:
+                fd.seek(offset)
+            offset = fd.tell()
+            while True:
+                try:
+                    record = pickle.load(fd)
+                except:
+                    # end of journal or partially written trailing record
+                    break
+                index.apply(record)
+                offset    = fd.tell()
+                nrecords += 1
+        index.pop_pending()
+        return offset, nrecords
+
+    def __load_walk_repo(self, repoPath):
+        """load repository snapshot and replay its journal. Returns loaded
+        repo dict and journal state"""
+        repo  = self.__load_repository_pickle_file( os.path.join(repoPath, self.__repoFile) )
+        uid   = repo.get('journal_uid', None)
+        state = (uid, None, 0)
+        journalPath = os.path.join(repoPath, self.__repoJournal)
+        if uid is not None and self.__get_journal_uid(journalPath) == uid:
+            offset, nrecords = self.__replay_journal(journalPath, index=_TreeIndex(repo['walk_repo']))
+            state = (uid, offset, nrecords)
+        return repo, state
+
+    def __get_walk_repo_stat(self, repoPath):
+        """get snapshot and journal files (mtime, size, inode) stat key.
+        Both files are only written under repository lock and replaced
+        files get a new inode, therefore an unchanged key means the tree
+        on disk did not change"""
+        key = []
+        for name in (self.__repoFile, self.__repoJournal):
+            try:
+                st = os.stat(os.path.join(repoPath, name))
+            except OSError:
+                key.append(None)
+            else:
+                key.append( (getattr(st, 'st_mtime_ns', st.st_mtime), st.st_size, st.st_ino) )
+        return tuple(key)
+
+    def __reload_walk_repo(self):
+        """update in memory tree from disk. When snapshot and journal files
+        did not change since last read or written by this instance nothing
+        is read. When snapshot did not change since last load and no
+        mutation is pending, only journal tail is replayed. Must be called
+        with repository lock acquired"""
+        uid, offset, nrecords = self.__journalState
+        journalPath = os.path.join(self.__path, self.__repoJournal)
+        stat        = self.__get_walk_repo_stat(self.__path)
+        if offset is not None and not len(self.__index.pending):
+            if stat == self.__walkRepoStat:
+                return
+            if self.__get_journal_uid(journalPath) == uid:
+                try:
+                    offset, n = self.__replay_journal(journalPath, index=self.__index, offset=offset)
+                except:
+                    pass # fallback to full load
+                else:
+                    self.__journalState = (uid, offset, nrecords+n)
+                    self.__walkRepoStat = stat
+                    return
+        self.__walkRepoStat = None
+        repo, self.__journalState = self.__load_walk_repo(self.__path)
+        self.__repo['files_info_layout'] = repo.get('files_info_layout', 'file')
+        self.__set_walk_repo(repo['walk_repo'])
+        self.__walkRepoStat = stat
+
+    def __commit_walk_repo(self, fsync=None):
+        """append in memory tree pending mutations to journal or compact
+        journal into a new snapshot. Must be called with repository lock
+        acquired right after __reload_walk_repo and tree mutations"""
+        uid, offset, nrecords = self.__journalState
+        records = self.__index.pending
+        if not len(records):
+            return True, None
+        if fsync is None:
+            fsync = self.__get_fsync()[2]
+        if offset is None or nrecords+len(records) >= self.JOURNAL_COMPACTION_SIZE:
+            return self.__save_repository_pickle_file(lockFirst=False, raiseError=False, fsync=fsync)
+        try:
+            with open(os.path.join(self.__path, self.__repoJournal), 'r+b') as fd:
+                fd.seek(offset)
+                for record in records:
+                    pickle.dump( record,fd, protocol=self._DEFAULT_PICKLE_PROTOCOL )
+                offset = fd.tell()
+                fd.truncate()
+                if fsync:
+                    fd.flush()
+                    os.fsync(fd.fileno())
+        except Exception as err:
+            self.__walkRepoStat = None
+            return False, "Unable to save repository journal (%s)"%str(err)
+        self.__index.pop_pending()
+        self.__journalState = (uid, offset, nrecords+len(records))
+        self.__walkRepoStat = self.__get_walk_repo_stat(self.__path)
+        return True, None
+
     def __load_repository_pickle_file(self, repoPath):
         try:
             fd = open(repoPath, 'rb')
         except Exception as err:
             raise Exception("Unable to open repository file(%s)"%str(err))
-        # read
+        # read at once
         try:
-            repo = pickle.load( fd )
+            repo = pickle.loads( fd.read() )
         except Exception as err:
             fd.close()
             raise Exception("Unable to load pickle repository (%s)"%str(err) )
@@ -861,7 +2350,7 @@ class Repository(object):
         # return
         return repo
 
-    def __load_repository(self, path, verbose=True, safeMode=True):
+    def __load_repository(self, path, verbose=True, safeMode=True, readonly=False, lazy=False):
         # try to open
         if path.strip() in ('','.'):
             path = os.getcwd()
@@ -870,10 +2359,13 @@ class Repository(object):
             repoPath = re.sub(r'([\\])\1+', r'\1', repoPath).replace('\\','\\\\')
         if not self.is_repository(repoPath):
             raise Exception("No repository found in '%s'"%str(repoPath))
-        # update locker serverFile and start
-        serverFile    = os.path.join(repoPath, self.__repoLock)
-        self.__locker = FACTORY(key=serverFile, password=self.__password, serverFile=serverFile, autoconnect=False, reconnect=False)
-        self.__locker.start()
+        # update locker serverFile and start. readonly never starts a locker
+        if readonly:
+            self.__locker = None
+            safeMode      = False
+        else:
+            self.__locker = self.__create_locker(repoPath)
+        self.__readonly = readonly
         # acquire lock
         if safeMode:
             acquired, lockId = self.__locker.acquire_lock(path=repoPath, timeout=self.timeout)
@@ -882,9 +2374,14 @@ class Repository(object):
         # load repository
         error = None
         try:
-            repo = self.__load_repository_pickle_file( os.path.join(repoPath, self.__repoFile) )
+            stat = self.__get_walk_repo_stat(repoPath)
+            repo, journalState = self.__load_walk_repo(repoPath)
             # get paths dict
-            repoFiles, errors = self.__sync_files(repoPath=repoPath, dirs=repo['walk_repo'])
+            layout = repo.get('files_info_layout', 'file')
+            if lazy:
+                repoFiles, errors = repo['walk_repo'], []
+            else:
+                repoFiles, errors = self.__sync_files(repoPath=repoPath, dirs=repo['walk_repo'], layout=layout)
             if len(errors) and verbose:
                 warnings.warn("\n".join(errors))
             self.__path = repoPath
@@ -892,7 +2389,10 @@ class Repository(object):
             self.__repo['repository_information'] = repo['repository_information']
             self.__repo['create_utctime']         = repo['create_utctime']
             self.__repo['last_update_utctime']    = repo['last_update_utctime']
-            self.__repo['walk_repo']              = repoFiles
+            self.__repo['files_info_layout']      = layout
+            self.__set_walk_repo(repoFiles)
+            self.__journalState = journalState
+            self.__walkRepoStat = stat
         except Exception as err:
             error = str(err)
         # release lock
@@ -917,29 +2417,43 @@ class Repository(object):
         """Get repository unique name as generated when repository was created"""
         return self.__repo['repository_unique_name']
 
+    @property
+    def filesInfoLayout(self):
+        """Get how files info and class are stored on disk. Either 'file'
+        where every file has its own info and class files or 'directory'
+        where every directory has a single files info store"""
+        return self.__repo.get('files_info_layout', 'file')
+
     def close(self):
         if self.__locker is not None:
             self.__locker.stop()
 
-    def get_stats(self):
+    def get_stats(self, verify=False):
         """
         Get repository descriptive stats
 
+        :Parameters:
+            #. verify (boolean): Whether to count only files and directories
+               found on disk along with their info files. If False, counters
+               of the in memory repository tree are returned at no cost.
+
         :Returns:
             #. numberOfDirectories (integer): Number of diretories in repository
             #. numberOfFiles (integer): Number of files in repository
         """
+        assert isinstance(verify, bool), "verify must be boolean"
         if self.__path is None:
             return 0,0
+        if not verify:
+            return self.__index.numberOfDirectories, self.__index.numberOfFiles
         nfiles = 0
         ndirs  = 0
-        for fdict in self.get_repository_state():
-            fdname = list(fdict)[0]
+        for fdname, kind, (exists, info) in self.iter_repository_state(checkDisk=True):
             if fdname == '':
                 continue
-            if fdict[fdname].get('pyrepfileinfo', False):
+            if kind == 'file' and info:
                 nfiles += 1
-            elif fdict[fdname].get('pyrepdirinfo', False):
+            elif kind == 'dir' and info:
                 ndirs += 1
             else:
                 # this could happen with asynchronous calls upon the repository
@@ -960,7 +2474,17 @@ class Repository(object):
                          'last_update_utctime': None,
                          'pyrep_version': str(__version__),
                          'repository_information': '',
+                         'files_info_layout': 'file',
                          'walk_repo': []}
+        self.__index  = _TreeIndex(self.__repo['walk_repo'])
+        self.__journalState = (None, None, 0)
+        self.__walkRepoStat = None
+        self.__loadTime     = None
+
+    def __set_walk_repo(self, walkRepo):
+        """set repository 'walk_repo' and rebuild its index"""
+        self.__repo['walk_repo'] = walkRepo
+        self.__index.reset(walkRepo)
 
 
     def is_repository(self, path):
@@ -983,7 +2507,8 @@ class Repository(object):
             return False
 
 
-    def load_repository(self, path, verbose=True, ntrials=3, safeMode=True):
+    @lock_operation
+    def load_repository(self, path, verbose=True, ntrials=3, safeMode=True, readonly=False, lazy=False):
         """
         Load repository from a directory path and update the current instance.
         First, new repository still will be loaded. If failed, then old
@@ -1004,28 +2529,81 @@ class Repository(object):
             #. safeMode (boolean): loading repository can be done without
                acquiring from multiple processes. Not acquiring the lock
                can be unsafe if another process is altering the repository
+            #. readonly (boolean): Whether to load repository in readonly
+               mode where no locker is started and altering calls are
+               refused. Repository tree is the one found on disk at loading
+               time, load_repository must be called again to see changes
+               made by other processes.
+            #. lazy (boolean): Whether to trust the repository tree as saved
+               in '.pyreprepo' and its journal without checking that every
+               file, info file and directory exists on disk. Entries are
+               then validated when first touched, as every file operation
+               checks its file on disk. verify can be called later to run
+               the full check. Loading duration is given by loadTime.
 
         :Returns:
              #. repository (pyrep.Repository): returns self repository with loaded data.
         """
         assert isinstance(safeMode, bool), "safeMode must be boolean"
+        assert isinstance(readonly, bool), "readonly must be boolean"
+        assert isinstance(lazy, bool), "lazy must be boolean"
         assert isinstance(ntrials, int), "ntrials must be integer"
         assert ntrials>0, "ntrials must be >0"
         repo = None
+        tic  = time.time()
         for _trial in range(ntrials):
             try:
-                self.__load_repository(path=path, verbose=True, safeMode=safeMode)
+                self.__load_repository(path=path, verbose=True, safeMode=safeMode, readonly=readonly, lazy=lazy)
             except Exception as err1:
                 error = "Unable to load repository (%s)"%(err1, )
+                self.__failed_trial(_trial, error)
             else:
                 error = None
                 repo  = self
                 break
+        self.__loadTime = time.time()-tic
         # check and return
         assert error is None, error
         return repo
 
-    def create_repository(self, path, info=None, description=None, replace=True, allowNoneEmpty=True, raiseError=True):
+    @path_required
+    def verify(self, background=False, workers=None):
+        """
+        Verify that all repository directories, files and files info are
+        found on disk. This is the check skipped when loading repository
+        lazily. Repository tree is not altered.
+
+        :Parameters:
+            #. background (boolean): Whether to run verification in a
+               background thread.
+            #. workers (None, int): Number of threads listing directories.
+               If None, VERIFY_WORKERS is used.
+
+        :Returns:
+            #. result (tuple, multiprocessing.pool.AsyncResult): (ok, errors)
+               tuple where ok is whether all is found on disk and errors is
+               the list of found problems. If background is True, an
+               AsyncResult is returned which get method returns the tuple.
+        """
+        assert isinstance(background, bool), "background must be boolean"
+        assert workers is None or isinstance(workers, int), "workers must be None or integer"
+        repoPath = self.__path
+        layout   = self.filesInfoLayout
+        walkRepo = copy.deepcopy(self.__repo['walk_repo'])
+        def _verify():
+            _, errors = self.__sync_files(repoPath=repoPath, dirs=walkRepo, layout=layout, workers=workers)
+            return not len(errors), errors
+        if not background:
+            return _verify()
+        pool = ThreadPool(processes=1)
+        try:
+            return pool.apply_async(_verify)
+        finally:
+            pool.close()
+
+    @writable_required
+    @lock_operation
+    def create_repository(self, path, info=None, description=None, replace=True, allowNoneEmpty=True, raiseError=True, filesInfoLayout='file'):
         """
         create a repository in a directory. This method insures the creation of
         the directory in the system if it is missing.\n
@@ -1043,6 +2621,11 @@ class Repository(object):
                directory.
             #. raiseError (boolean): Whether to raise encountered error instead
                of returning failure.
+            #. filesInfoLayout (string): How files info and class are stored.
+               'file' stores two small files next to every repository file
+               while 'directory' stores them all in a single '.pyrepfilesinfo'
+               file per directory which is faster to walk and lighter on the
+               file system for directories of many small files.
 
         :Returns:
             #. success (boolean): Whether creating repository was successful
@@ -1052,6 +2635,7 @@ class Repository(object):
         assert isinstance(allowNoneEmpty, bool), "allowNoneEmpty must be boolean"
         assert isinstance(replace, bool), "replace must be boolean"
         assert isinstance(path, basestring), "path must be string"
+        assert filesInfoLayout in ('file','directory'), "filesInfoLayout must be 'file' or 'directory'"
         if info is None:
             info = ''
         try:
@@ -1094,25 +2678,24 @@ class Repository(object):
         self.reset()
         self.__path = realPath.rstrip(os.sep)
         self.__repo['repository_information'] = info
+        self.__repo['files_info_layout']      = filesInfoLayout
         # set locker
-        serverFile    = os.path.join(self.__path, self.__repoLock)
-        self.__locker = FACTORY(key=serverFile, password=self.__password, serverFile=serverFile, autoconnect=False, reconnect=False)
-        #self.__locker.debugMode = True
-        self.__locker.start()
+        self.__locker = self.__create_locker(self.__path)
         # save repository
         saved = self.save(description=description)
         if not saved:
             self.__repo = oldRepo
             self.__path = oldPath
+            self.__index.reset(self.__repo['walk_repo'])
             message.append("Absolute path and directories might be created but no pyrep Repository is created. Previous repository state restored")
             if self.__path is not None:
-                serverFile    = os.path.join(self.__path, self.__repoLock)
-                self.__locker = FACTORY(key=serverFile, password=self.__password, serverFile=serverFile, autoconnect=False, reconnect=False)
-                self.__locker.start()
+                self.__locker = self.__create_locker(self.__path)
             return False, '\n'.join(message)
         # return
         return True, '\n'.join(message)
 
+    @writable_required
+    @lock_operation
     def remove_repository(self, path=None, password=None, removeEmptyDirs=True):
         """
         Remove all repository from path along with all repository tracked files.
@@ -1138,11 +2721,10 @@ class Repository(object):
         assert repo.locker.isServer, "It's not safe to remove repository tree from a client"
         assert not len(repo.locker._clientsLUT), "It's not safe to remove repository tree when other instances are still connected"
         # remove repo files and directories
-        for fdict in reversed(repo.get_repository_state()):
-            relaPath   = list(fdict)[0]
+        for relaPath, kind, _ in reversed(list(repo.iter_repository_state())):
             realPath   = os.path.join(repo.path, relaPath)
             path, name = os.path.split(realPath)
-            if fdict[relaPath]['type'] == 'file':
+            if kind == 'file':
                 if os.path.isfile(realPath):
                     os.remove(realPath)
                 if os.path.isfile(os.path.join(repo.path,path,self.__fileInfo%name)):
@@ -1151,24 +2733,35 @@ class Repository(object):
                     os.remove(os.path.join(repo.path,path,self.__fileLock%name))
                 if os.path.isfile(os.path.join(repo.path,path,self.__fileClass%name)):
                     os.remove(os.path.join(repo.path,path,self.__fileClass%name))
-            elif fdict[relaPath]['type'] == 'dir':
+            elif kind == 'dir':
+                for bname in os.listdir(realPath) if os.path.isdir(realPath) else []:
+                    if bname.endswith(self.__fileBuffers[3:]):
+                        os.remove(os.path.join(realPath,bname))
                 if os.path.isfile(os.path.join(realPath,self.__dirInfo)):
                     os.remove(os.path.join(realPath,self.__dirInfo))
                 if os.path.isfile(os.path.join(realPath,self.__dirLock)):
                     os.remove(os.path.join(realPath,self.__dirLock))
+                if os.path.isfile(os.path.join(realPath,self.__filesInfo)):
+                    os.remove(os.path.join(realPath,self.__filesInfo))
                 if not len(os.listdir(realPath)) and removeEmptyDirs:
                     shutil.rmtree( realPath )
         # remove repo information file
         if os.path.isfile(os.path.join(repo.path,self.__repoFile)):
             os.remove(os.path.join(repo.path,self.__repoFile))
+        if os.path.isfile(os.path.join(repo.path,self.__repoJournal)):
+            os.remove(os.path.join(repo.path,self.__repoJournal))
         if os.path.isfile(os.path.join(repo.path,self.__repoLock)):
             os.remove(os.path.join(repo.path,self.__repoLock))
+        if os.path.isdir(os.path.join(repo.path,self.__commitQueue)):
+            shutil.rmtree(os.path.join(repo.path,self.__commitQueue), ignore_errors=True)
         if not len(os.listdir(repo.path)) and removeEmptyDirs:
             shutil.rmtree( repo.path )
         # close repo
         repo.close()
 
     @path_required
+    @writable_required
+    @lock_operation
     def save(self, description=None, raiseError=True, ntrials=3):
         """
         Save repository '.pyreprepo' to disk and create (if missing) or
@@ -1218,18 +2811,13 @@ class Repository(object):
                 self.__save_dirinfo(description=description, dirInfoPath=dirInfoPath)
                 # load and update repository info if existing
                 if os.path.isfile(repoInfoPath):
-                    with open(repoInfoPath, 'rb') as fd:
-                        repo = self.__load_repository_pickle_file(os.path.join(self.__path, self.__repoFile))
-                        self.__repo['walk_repo'] = repo['walk_repo']
-                # create repository
-                with open(repoInfoPath, 'wb') as fd:
-                    self.__repo["last_update_utctime"] = time.time()
-                    pickle.dump( self.__repo,fd, protocol=self._DEFAULT_PICKLE_PROTOCOL )
-                    fd.flush()
-                    os.fsync(fd.fileno())
+                    self.__reload_walk_repo()
+                # create repository snapshot and reset journal
+                saved, error = self.__save_repository_pickle_file(lockFirst=False, raiseError=False)
+                assert saved, error
             except Exception as err:
                 error = "Unable to save repository (%s)"%err
-                if self.DEBUG_PRINT_FAILED_TRIALS: print("Trial %i failed in Repository.%s (%s). Set Repository.DEBUG_PRINT_FAILED_TRIALS to False to mute"%(_trial, inspect.stack()[1][3], str(error)))
+                self.__failed_trial(_trial, error)
             else:
                 break
         # release lock
@@ -1239,6 +2827,91 @@ class Repository(object):
         return error is None, error
 
 
+    @path_required
+    @writable_required
+    @lock_operation
+    def set_files_info_layout(self, layout, raiseError=True):
+        """
+        Convert how files info and class are stored on disk. This is the
+        migration path between the two supported layouts. Repository lock is
+        held during the conversion, still files should not be dumped, updated
+        or pulled by other processes meanwhile.
+
+        :Parameters:
+            #. layout (string): 'file' to store info and class files next to
+               every repository file or 'directory' to store all files info
+               and class of a directory in a single '.pyrepfilesinfo' file.
+            #. raiseError (boolean): Whether to raise encountered error instead
+               of returning failure.
+
+        :Returns:
+            #. success (boolean): Whether conversion was successful.
+            #. error (None, string): Reason why conversion failed.
+        """
+        assert layout in ('file','directory'), "layout must be 'file' or 'directory'"
+        assert isinstance(raiseError, bool), "raiseError must be boolean"
+        acquired, lockId = self.__locker.acquire_lock(self.__path, timeout=self.timeout)
+        if not acquired:
+            m = "code %s. Unable to aquire the lock when calling 'set_files_info_layout'. You may try again!"%(lockId,)
+            assert not raiseError, m
+            return False, m
+        error = None
+        try:
+            self.__reload_walk_repo()
+            oldLayout = self.__repo.get('files_info_layout', 'file')
+            if oldLayout != layout:
+                dirs = [''] + list(self.walk_directories_path(recursive=True))
+                # write new layout first so a failure leaves old layout intact
+                for relDir in dirs:
+                    dirPath = os.path.join(self.__path, relDir)
+                    names   = [os.path.basename(f) for f in self.walk_files_path(relativePath=relDir)]
+                    if layout == 'directory':
+                        store = {}
+                        for name in names:
+                            infoPath = os.path.join(dirPath,self.__fileInfo%name)
+                            if not os.path.isfile(infoPath):
+                                continue
+                            with open(infoPath, 'rb') as fd:
+                                info = pickle.load(fd)
+                            # class file content is already a pickle
+                            klass = pickle.dumps(None, protocol=self._DEFAULT_PICKLE_PROTOCOL)
+                            if os.path.isfile(os.path.join(dirPath,self.__fileClass%name)):
+                                with open(os.path.join(dirPath,self.__fileClass%name), 'rb') as fd:
+                                    klass = fd.read()
+                            store[name] = (info, klass)
+                        if len(store):
+                            self.__save_files_info(dirPath, store)
+                        elif os.path.isfile(os.path.join(dirPath,self.__filesInfo)):
+                            os.remove(os.path.join(dirPath,self.__filesInfo))
+                    else:
+                        store = self.__load_files_info(dirPath)
+                        for name, (info, klass) in store.items():
+                            atomic_write(os.path.join(dirPath,self.__fileInfo%name), pickle.dumps(info, protocol=self._DEFAULT_PICKLE_PROTOCOL))
+                            atomic_write(os.path.join(dirPath,self.__fileClass%name), klass)
+                # save new layout in repository snapshot
+                self.__repo['files_info_layout'] = layout
+                saved, error = self.__save_repository_pickle_file(lockFirst=False, raiseError=False)
+                if not saved:
+                    self.__repo['files_info_layout'] = oldLayout
+                    raise Exception(error)
+                # clean old layout
+                for relDir in dirs:
+                    dirPath = os.path.join(self.__path, relDir)
+                    if layout == 'directory':
+                        for name in self.__load_files_info(dirPath):
+                            for pattern in (self.__fileInfo, self.__fileClass):
+                                if os.path.isfile(os.path.join(dirPath,pattern%name)):
+                                    os.remove(os.path.join(dirPath,pattern%name))
+                    elif os.path.isfile(os.path.join(dirPath,self.__filesInfo)):
+                        os.remove(os.path.join(dirPath,self.__filesInfo))
+        except Exception as err:
+            error = "Unable to set files info layout to '%s' (%s)"%(layout, str(err))
+        # release lock
+        self.__locker.release_lock(lockId)
+        # return
+        assert error is None or not raiseError, error
+        return error is None, error
+
     def is_name_allowed(self, path):
         """
         Get whether creating a file or a directory from the basenane of the given
@@ -1257,11 +2930,11 @@ class Repository(object):
         if not len(name):
             return False, "empty name is not allowed"
         # exact match
-        for em in [self.__repoLock,self.__repoFile,self.__dirInfo,self.__dirLock]:
+        for em in [self.__repoLock,self.__repoFile,self.__repoJournal,self.__dirInfo,self.__dirLock,self.__filesInfo,self.__commitQueue]:
             if name == em:
                 return False, "name '%s' is reserved for pyrep internal usage"%em
         # pattern match
-        for pm in [self.__fileInfo,self.__fileLock]:#,self.__objectDir]:
+        for pm in [self.__fileInfo,self.__fileLock,self.__fileTemp,self.__fileBuffers]:#,self.__objectDir]:
             if name == pm or (name.endswith(pm[3:]) and name.startswith('.')):
                 return False, "name pattern '%s' is not allowed as result may be reserved for pyrep internal usage"%pm
         # name is ok
@@ -1310,59 +2983,77 @@ class Repository(object):
                    * 'pyrepdirinfo': In case of a directory whether .pyrepdirinfo exists
         """
         state = []
-        def _walk_dir(relaPath, dirList):
-            dirDict = {'type':'dir',
-                       'exists':os.path.isdir(os.path.join(self.__path,relaPath)),
-                       'pyrepdirinfo':os.path.isfile(os.path.join(self.__path,relaPath,self.__dirInfo)),
-                      }
-            state.append({relaPath:dirDict})
-            # loop files and dirobjects
-            for fname in sorted([f for f in dirList if isinstance(f, basestring)]):
-                relaFilePath = os.path.join(relaPath,fname)
-                realFilePath = os.path.join(self.__path,relaFilePath)
-                #if os.path.isdir(realFilePath) and df.startswith('.') and df.endswith(self.__objectDir[3:]):
-                #    fileDict = {'type':'objectdir',
-                #                'exists':True,
-                #                'pyrepfileinfo':os.path.isfile(os.path.join(self.__path,relaPath,self.__fileInfo%fname)),
-                #               }
-                #else:
-                #    fileDict = {'type':'file',
-                #                'exists':os.path.isfile(realFilePath),
-                #                'pyrepfileinfo':os.path.isfile(os.path.join(self.__path,relaPath,self.__fileInfo%fname)),
-                #               }
-                fileDict = {'type':'file',
-                            'exists':os.path.isfile(realFilePath),
-                            'pyrepfileinfo':os.path.isfile(os.path.join(self.__path,relaPath,self.__fileInfo%fname)),
-                           }
-                state.append({relaFilePath:fileDict})
-            # loop directories
-            #for ddict in sorted([d for d in dirList if isinstance(d, dict) and len(d)], key=lambda k: list(k)[0]):
-            for ddict in sorted([d for d in dirList if isinstance(d, dict)], key=lambda k: list(k)[0]):
-                dirname = list(ddict)[0]
-                _walk_dir(relaPath=os.path.join(relaPath,dirname), dirList=ddict[dirname])
-        # call recursive _walk_dir
+        for path, kind, (exists, info) in self.iter_repository_state(relaPath=relaPath, checkDisk=True):
+            if kind == 'dir':
+                state.append({path:{'type':kind, 'exists':exists, 'pyrepdirinfo':info}})
+            else:
+                state.append({path:{'type':kind, 'exists':exists, 'pyrepfileinfo':info}})
+        return state
+
+    @path_required
+    def iter_repository_state(self, relaPath=None, checkDisk=False):
+        """
+        Walk repository state and yield a compact (path, type, flags) tuple
+        per tracked directory and file. Order is the same as
+        get_repository_state. Directories are listed on disk lazily while
+        walking, therefore the state is never built in memory.
+
+        :Parameters:
+            #. relaPath (None, str): relative directory path from where to
+               start. If None all repository is walked.
+            #. checkDisk (boolean): Whether to check tracked directories and
+               files on disk.
+
+        :Returns:
+            #. state (generator): Yields (path, type, flags) tuples where
+               path is the relative path, type is 'dir' or 'file' and flags
+               is None if checkDisk is False or otherwise an (exists, info)
+               tuple of whether the directory or file is found on disk and
+               whether its .pyrepdirinfo or its file info is found on disk.
+        """
+        assert isinstance(checkDisk, bool), "checkDisk must be boolean"
         if relaPath is None:
-            _walk_dir(relaPath='', dirList=self.__repo['walk_repo'])
+            relaPath = ''
+            dirList  = self.__repo['walk_repo']
         else:
             assert isinstance(relaPath, basestring), "relaPath must be None or a str"
             relaPath = self.to_repo_relative_path(path=relaPath, split=False)
-            spath    = relaPath.split(os.sep)
-            dirList  = self.__repo['walk_repo']
-            while len(spath):
-                dirname = spath.pop(0)
-                dList   = [d for d in dirList if isinstance(d, dict)]
-                if not len(dList):
-                    dirList = None
-                    break
-                cDict = [d for d in dList if dirname in d]
-                if not len(cDict):
-                    dirList = None
-                    break
-                dirList = cDict[0][dirname]
-            if dirList is not None:
-                _walk_dir(relaPath=relaPath, dirList=dirList)
-        # return state list
-        return state
+            dirList  = self.__index.get_directory(relaPath)
+        if dirList is None:
+            return
+        # collect directories in walking order
+        nodes = []
+        def _collect(relaPath, dirList):
+            nodes.append( (relaPath, dirList) )
+            for ddict in sorted([d for d in dirList if isinstance(d, dict)], key=lambda k: list(k)[0]):
+                dirname = list(ddict)[0]
+                _collect(os.path.join(relaPath,dirname), ddict[dirname])
+        _collect(relaPath, dirList)
+        # walk directories
+        layout   = self.filesInfoLayout
+        listings = None
+        if checkDisk:
+            listings = self.__iter_directories(self.__path, [n[0] for n in nodes], layout=layout)
+        try:
+            for relaPath, dirList in nodes:
+                flags = None
+                if checkDisk:
+                    _, (entries, store) = next(listings)
+                    flags = (entries is not None, entries is not None and entries.get(self.__dirInfo, True) is False)
+                    if entries is None:
+                        entries = {}
+                yield (relaPath, 'dir', flags)
+                for fname in sorted([f for f in dirList if isinstance(f, basestring)]):
+                    if checkDisk:
+                        if layout == 'directory':
+                            infoOnDisk = store is not None and fname in store
+                        else:
+                            infoOnDisk = entries.get(self.__fileInfo%fname, True) is False
+                        flags = (entries.get(fname, True) is False, infoOnDisk)
+                    yield (os.path.join(relaPath,fname), 'file', flags)
+        finally:
+            if listings is not None:
+                listings.close()
 
     def get_repository_directory(self, relativePath):
         """
@@ -1398,10 +3089,8 @@ class Repository(object):
             return None, "file is not a registered repository file."
         if not infoOnDisk:
             return None, "file is a registered repository file but info file missing"
-        fileInfoPath = os.path.join(self.__path,os.path.dirname(relativePath),self.__fileInfo%fileName)
         try:
-            with open(fileInfoPath, 'rb') as fd:
-                info = pickle.load(fd)
+            info = self.__read_file_info(relativePath)
         except Exception as err:
             return None, "Unable to read file info from disk (%s)"%str(err)
         return info, ''
@@ -1438,24 +3127,8 @@ class Repository(object):
             return False, False, False, False
         relaDir, name = os.path.split(relativePath)
         fileOnDisk    = os.path.isfile(os.path.join(self.__path, relativePath))
-        infoOnDisk    = os.path.isfile(os.path.join(self.__path,os.path.dirname(relativePath),self.__fileInfo%name))
-        classOnDisk   = os.path.isfile(os.path.join(self.__path,os.path.dirname(relativePath),self.__fileClass%name))
-        cDir          = self.__repo['walk_repo']
-        if len(relaDir):
-            for dirname in relaDir.split(os.sep):
-                dList = [d for d in cDir if isinstance(d, dict)]
-                if not len(dList):
-                    cDir = None
-                    break
-                cDict = [d for d in dList if dirname in d]
-                if not len(cDict):
-                    cDir = None
-                    break
-                cDir = cDict[0][dirname]
-        if cDir is None:
-            return False, fileOnDisk, infoOnDisk, classOnDisk
-        #if name not in cDir:
-        if str(name) not in [str(i) for i in cDir]:
+        infoOnDisk, classOnDisk = self.__is_file_info_on_disk(relativePath)
+        if not self.__index.is_file(relativePath):
             return False, fileOnDisk, infoOnDisk, classOnDisk
         # this is a repository registered file. check whether all is on disk
         return True, fileOnDisk, infoOnDisk, classOnDisk
@@ -1507,14 +3180,24 @@ class Repository(object):
         assert isinstance(fullPath, bool), "fullPath must be boolean"
         assert isinstance(recursive, bool), "recursive must be boolean"
         relativePath = self.to_repo_relative_path(path=relativePath, split=False)
+        layout = self.__repo.get('files_info_layout', 'file')
+        stores = {}
         for relaPath in self.walk_files_path(relativePath=relativePath, fullPath=False, recursive=recursive):
             fpath, fname = os.path.split(relaPath)
-            fileInfoPath = os.path.join(self.__path,fpath,self.__fileInfo%fname)
-            if os.path.isfile(fileInfoPath):
-                with open(fileInfoPath, 'rb') as fd:
-                    info = pickle.load(fd)
+            if layout == 'directory':
+                # files info store is read once per directory
+                if fpath not in stores:
+                    stores[fpath] = self.__load_files_info(os.path.join(self.__path,fpath))
+                info = stores[fpath].get(fname, None)
+                if info is not None:
+                    info = dict(info[0])
             else:
-                info = None
+                fileInfoPath = os.path.join(self.__path,fpath,self.__fileInfo%fname)
+                if os.path.isfile(fileInfoPath):
+                    with open(fileInfoPath, 'rb') as fd:
+                        info = pickle.load(fd)
+                else:
+                    info = None
             if fullPath:
                 yield (os.path.join(self.__path, relaPath), info)
             else:
@@ -1638,14 +3321,26 @@ class Repository(object):
             t.type = tarfile.DIRTYPE
             tarHandler.addfile(t)
             tarHandler.add(os.path.join(self.__path,dpath,self.__dirInfo), arcname=self.__dirInfo)
+        # add directories files info stores
+        for dpath in [''] + list(self.walk_directories_path(recursive=True)):
+            if os.path.isfile(os.path.join(self.__path,dpath,self.__filesInfo)):
+                tarHandler.add(os.path.join(self.__path,dpath,self.__filesInfo), arcname=self.__filesInfo)
         # walk files and add to tar
+        entries = {}
         for fpath in self.walk_files_path(recursive=True):
             relaPath, fname = os.path.split(fpath)
             tarHandler.add(os.path.join(self.__path,fpath), arcname=fname)
-            tarHandler.add(os.path.join(self.__path,relaPath,self.__fileInfo%fname), arcname=self.__fileInfo%fname)
-            tarHandler.add(os.path.join(self.__path,relaPath,self.__fileClass%fname), arcname=self.__fileClass%fname)
+            for pattern in (self.__fileInfo, self.__fileClass):
+                if os.path.isfile(os.path.join(self.__path,relaPath,pattern%fname)):
+                    tarHandler.add(os.path.join(self.__path,relaPath,pattern%fname), arcname=pattern%fname)
+            if relaPath not in entries:
+                entries[relaPath] = os.listdir(os.path.join(self.__path,relaPath))
+            for bname in get_buffers_names(fname, entries[relaPath]):
+                tarHandler.add(os.path.join(self.__path,relaPath,bname), arcname=bname)
         # save repository .pyrepinfo
         tarHandler.add(os.path.join(self.__path,self.__repoFile), arcname=".pyrepinfo")
+        if os.path.isfile(os.path.join(self.__path,self.__repoJournal)):
+            tarHandler.add(os.path.join(self.__path,self.__repoJournal), arcname=self.__repoJournal)
         # close tar file
         tarHandler.close()
 
@@ -1746,7 +3441,67 @@ class Repository(object):
     #    return error is None, error
 
 
+    def __add_directory(self, relativePath, description=None, clean=False, ntrials=3, fsync=None):
+        """add directory and all missing directories in relative path to the
+        in memory tree and create them on disk. Must be called with repository
+        lock acquired after __reload_walk_repo. fsync sets whether directories
+        info files are fsynced, if None repository durability decides.
+        Returns error or None"""
+        error    = None
+        relaPath = ''
+        dirPath  = self.__path
+        spath    = relativePath.split(os.sep)
+        for idx, name in enumerate(spath):
+            dirLockId = None
+            # create and acquire directory lock
+            if dirPath != self.__path:
+                acquired, dirLockId = self.__locker.acquire_lock(path=dirPath, timeout=self.timeout)
+                if not acquired:
+                    error = "Code %s. Unable to aquire the lock when adding '%s'. All prior relative directories were added. You may try again, to finish adding directory"%(dirLockId,dirPath)
+                    break
+            # add to directory
+            relaPath = os.path.join(relaPath, name)
+            dirPath  = os.path.join(dirPath, name)
+            riPath   = os.path.join(dirPath, self.__dirInfo)
+            for _trial in range(ntrials):
+                error = None
+                try:
+                    isTracked = self.__index.is_directory(relaPath)
+                    # clean directory
+                    if not isTracked and clean and os.path.exists(dirPath):
+                        try:
+                            shutil.rmtree( dirPath, ignore_errors=True )
+                        except Exception as err:
+                            error = "Unable to clean directory '%s' (%s)"%(dirPath, err)
+                            break
+                    # create directory
+                    if not os.path.exists(dirPath):
+                        try:
+                            os.mkdir(dirPath)
+                        except Exception as err:
+                            error = "Unable to create directory '%s' (%s)"%(dirPath, err)
+                            break
+                    # create and dump dirinfo
+                    self.__save_dirinfo(description=[None, description][idx==len(spath)-1],
+                                        dirInfoPath=riPath, create=True, fsync=fsync)
+                    # update directory list
+                    if not isTracked:
+                        self.__index.add_directory(relaPath)
+                except Exception as err:
+                    error = "Unable to create directory '%s' info file (%s)"%(dirPath, str(err))
+                    self.__failed_trial(_trial, error)
+                else:
+                    break
+            if dirLockId is not None:
+                self.__locker.release_lock(dirLockId)
+            # break from main path loop
+            if error is not None:
+                break
+        return error
+
     @path_required
+    @writable_required
+    @lock_operation
     def add_directory(self, relativePath, description=None, clean=False,
                             raiseError=True, ntrials=3):
         """
@@ -1803,11 +3558,10 @@ class Repository(object):
         # load repository info
         for _trial in range(ntrials):
             try:
-                repo = self.__load_repository_pickle_file(os.path.join(self.__path, self.__repoFile))
-                self.__repo['walk_repo'] = repo['walk_repo']
+                self.__reload_walk_repo()
             except Exception as err:
                 error = str(err)
-                if self.DEBUG_PRINT_FAILED_TRIALS: print("Trial %i failed in Repository.%s (%s). Set Repository.DEBUG_PRINT_FAILED_TRIALS to False to mute"%(_trial, inspect.stack()[1][3], str(error)))
+                self.__failed_trial(_trial, error)
             else:
                 error = None
                 break
@@ -1816,70 +3570,15 @@ class Repository(object):
             assert not raiseError, Exception(error)
             return False, error
         # create directories
-        error     = None
-        posList   = self.__repo['walk_repo']
-        dirPath   = self.__path
-        spath     = path.split(os.sep)
-        for idx, name in enumerate(spath):
-            dirLockId = None
-            # create and acquire directory lock
-            if dirPath != self.__path:
-                acquired, dirLockId = self.__locker.acquire_lock(path=dirPath, timeout=self.timeout)
-                if not acquired:
-                    error = "Code %s. Unable to aquire the lock when adding '%s'. All prior relative directories were added. You may try again, to finish adding directory"%(dirLockId,dirPath)
-                    break
-            # add to directory
-            for _trial in range(ntrials):
-                try:
-                    dirPath = os.path.join(dirPath, name)
-                    riPath  = os.path.join(dirPath, self.__dirInfo)
-                    dList   = [d for d in posList if isinstance(d, dict)]
-                    dList   = [d for d in dList if name in d]
-                    # clean directory
-                    if not len(dList) and clean and os.path.exists(dirPath):
-                        try:
-                            shutil.rmtree( dirPath, ignore_errors=True )
-                        except Exception as err:
-                            error = "Unable to clean directory '%s' (%s)"%(dirPath, err)
-                            break
-                    # create directory
-                    if not os.path.exists(dirPath):
-                        try:
-                            os.mkdir(dirPath)
-                        except Exception as err:
-                            error = "Unable to create directory '%s' (%s)"%(dirPath, err)
-                            break
-                    # create and dump dirinfo
-                    self.__save_dirinfo(description=[None, description][idx==len(spath)-1],
-                                        dirInfoPath=riPath, create=True)
-                    # update directory list
-                    if not len(dList):
-                        rsd = {name:[]}
-                        posList.append(rsd)
-                        posList = rsd[name]
-                    else:
-                        assert len(dList) == 1, "Same directory name dict is found twice. This should'n have happened. Report issue"
-                        posList = dList[0][name]
-                except Exception as err:
-                    error = "Unable to create directory '%s' info file (%s)"%(dirPath, str(err))
-                    if self.DEBUG_PRINT_FAILED_TRIALS: print("Trial %i failed in Repository.%s (%s). Set Repository.DEBUG_PRINT_FAILED_TRIALS to False to mute"%(_trial, inspect.stack()[1][3], str(error)))
-                else:
-                    break
-            if dirLockId is not None:
-                self.__locker.release_lock(dirLockId)
-            # break from main path loop
-            if error is not None:
-                break
+        error = self.__add_directory(path, description=description, clean=clean, ntrials=ntrials)
         # save __repo
         if error is None:
             try:
-                _, error = self.__save_repository_pickle_file(lockFirst=False, raiseError=False)
+                _, error = self.__commit_walk_repo()
             except Exception as err:
                 error = str(err)
                 pass
         # release locks
-        if dirLockId is not None:
-            self.__locker.release_lock(dirLockId)
         self.__locker.release_lock(repoLockId)
         # check and return
         assert error is None or not raiseError, error
@@ -1900,6 +3599,8 @@ class Repository(object):
         return copy.deepcopy(self.__get_repository_parent_directory(relativePath))
 
     @path_required
+    @writable_required
+    @lock_operation
     def remove_directory(self, relativePath, clean=False, raiseError=True, ntrials=3):
         """
         Remove directory from repository tracking.
@@ -1959,29 +3660,24 @@ class Repository(object):
         for _trial in range(ntrials):
             error = None
             try:
-                dirList = self.__get_repository_parent_directory(relativePath=relativePath)
-                assert dirList is not None, "Given relative path '%s' is not a repository directory"%(relativePath,)
-                stateBefore = self.get_repository_state(relaPath=parentPath)
-                _files = [f for f in dirList if isinstance(f, basestring)]
-                _dirs  = [d for d in dirList if isinstance(d, dict)]
-                _dirs  = [d for d in dirList if dirName not in d]
-                _ = [dirList.pop(0) for _ in range(len(dirList))]
-                dirList.extend(_files)
-                dirList.extend(_dirs)
+                self.__reload_walk_repo()
+                assert self.__index.is_directory(relativePath), "Given relative path '%s' is not a repository directory"%(relativePath,)
+                stateBefore = list(self.iter_repository_state(relaPath=parentPath))
+                self.__index.remove_directory(relativePath)
                 if clean:
                     shutil.rmtree(realPath)
                 else:
-                    stateAfter = self.get_repository_state(relaPath=parentPath)
+                    stateAfter = self.iter_repository_state(relaPath=parentPath)
                     success, errors = self.__clean_before_after(stateBefore=stateBefore, stateAfter=stateAfter, keepNoneEmptyDirectory=True)
                     assert success, "\n".join(errors)
             except Exception as err:
                 error = str(err)
-                if self.DEBUG_PRINT_FAILED_TRIALS: print("Trial %s failed in Repository.%s (%s). Set Repository.DEBUG_PRINT_FAILED_TRIALS to False to mute"%(_trial, inspect.stack()[1][3], str(error)))
+                self.__failed_trial(_trial, error)
             else:
                 break
         # return
         if error is None:
-            _, error = self.__save_repository_pickle_file(lockFirst=False, raiseError=False)
+            _, error = self.__commit_walk_repo()
         # release locks
         self.__locker.release_lock(dirLockId)
         self.__locker.release_lock(repoLockId)
@@ -1991,6 +3687,8 @@ class Repository(object):
 
 
     @path_required
+    @writable_required
+    @lock_operation
     def rename_directory(self, relativePath, newName, raiseError=True, ntrials=3):
         """
         Rename a directory in the repository. It insures renaming the directory in the system.
@@ -2046,11 +3744,10 @@ class Repository(object):
         # load repository info
         for _trial in range(ntrials):
             try:
-                repo = self.__load_repository_pickle_file(os.path.join(self.__path, self.__repoFile))
-                self.__repo['walk_repo'] = repo['walk_repo']
+                self.__reload_walk_repo()
             except Exception as err:
                 error = str(err)
-                if self.DEBUG_PRINT_FAILED_TRIALS: print("Trial %i failed in Repository.%s (%s). Set Repository.DEBUG_PRINT_FAILED_TRIALS to False to mute"%(_trial, inspect.stack()[1][3], str(error)))
+                self.__failed_trial(_trial, error)
             else:
                 error = None
                 break
@@ -2063,27 +3760,21 @@ class Repository(object):
         for _trial in range(ntrials):
             error = None
             try:
-                dirList = self.__get_repository_parent_directory(relativePath=relativePath)
-                assert dirList is not None, "Given relative path '%s' is not a repository directory"%(relativePath,)
-                # change dirName in dirList
-                _dirDict = [nd for nd in dirList  if isinstance(nd,dict)]
-                _dirDict = [nd for nd in _dirDict if dirName in nd]
-                assert len(_dirDict) == 1, "This should not have happened. Directory not found in repository. Please report issue"
+                assert self.__index.is_directory(relativePath), "Given relative path '%s' is not a repository directory"%(relativePath,)
                 # rename directory
                 os.rename(realPath, newRealPath)
                 # update dirList
-                _dirDict[0][newName] = _dirDict[0][dirName]
-                _dirDict[0].pop(dirName)
+                self.__index.rename_directory(relativePath, newName)
                 # update and dump dirinfo
                 self.__save_dirinfo(description=None, dirInfoPath=parentPath, create=False)
             except Exception as err:
                 error = str(err)
-                if self.DEBUG_PRINT_FAILED_TRIALS: print("Trial %i failed in Repository.%s (%s). Set Repository.DEBUG_PRINT_FAILED_TRIALS to False to mute"%(_trial, inspect.stack()[1][3], str(error)))
+                self.__failed_trial(_trial, error)
             else:
                 error = None
                 break
         if error is None:
-            _, error = self.__save_repository_pickle_file(lockFirst=False, raiseError=False)
+            _, error = self.__commit_walk_repo()
         # release locks
         self.__locker.release_lock(dirLockId)
         self.__locker.release_lock(repoLockId)
@@ -2092,6 +3783,8 @@ class Repository(object):
         return error is None, error
 
     @path_required
+    @writable_required
+    @lock_operation
     def copy_directory(self, relativePath, newRelativePath,
                              overwrite=False, raiseError=True, ntrials=3):
         """
@@ -2158,15 +3851,6 @@ class Repository(object):
                 error = "New directory path '%s' already exist on disk. Set overwrite to True"%(newRealPath,)
                 assert not raiseError, error
                 return False, error
-        # add directory
-        try:
-            success, reason = self.add_directory(newParentRelativePath, raiseError=False, ntrials=ntrials)
-        except Exception as err:
-            reason  = "Unable to add directory (%s)"%(str(err))
-            success = False
-        if not success:
-            assert not raiseError, reason
-            return False, reason
         # lock repository
         acquired, repoLockId = self.__locker.acquire_lock(path=self.__path, timeout=self.timeout)
         if not acquired:
@@ -2174,12 +3858,20 @@ class Repository(object):
             assert not raiseError,  m
             return False,m
         try:
-            repo = self.__load_repository_pickle_file(os.path.join(self.__path, self.__repoFile))
-            self.__repo['walk_repo'] = repo['walk_repo']
+            self.__reload_walk_repo()
         except Exception as err:
             self.__locker.release_lock(repoLockId)
             assert not raiseError, Exception(str(err))
-            return False,m
+            return False,str(err)
+        # add new parent missing directories within the same lock and tree commit
+        if not self.__index.is_directory(newParentRelativePath):
+            error = self.__add_directory(newParentRelativePath, ntrials=ntrials)
+            if error is not None:
+                self.__commit_walk_repo()
+                self.__locker.release_lock(repoLockId)
+                error = "Unable to add directory (%s)"%(error,)
+                assert not raiseError, error
+                return False, error
         # create locks
         if parentRealPath != self.__path:
             acquired, dirLockId = self.__locker.acquire_lock(path=parentRealPath, timeout=self.timeout)
@@ -2206,38 +3898,28 @@ class Repository(object):
                 # make sure again because sometimes, when multiple processes are working on the same repo things can happen in between
                 assert self.is_repository_directory(relativePath), "Directory '%s' is not anymore a tracked repository directory"%(relativePath)
                 assert not self.is_repository_directory(newRelativePath), "Directory '%s' has become a tracked repository directory"%(relativePath)
-                dirList = self.__get_repository_parent_directory(relativePath=relativePath)
-                assert dirList is not None, "Given relative path '%s' is not a repository directory"%(relativePath,)
-                newDirList = self.__get_repository_parent_directory(relativePath=newRelativePath)
-                assert newDirList is not None, "Given new relative path '%s' parent directory is not a repository directory"%(newRelativePath,)
-                # change dirName in dirList
-                _dirDict = [nd for nd in dirList  if isinstance(nd,dict)]
-                _dirDict = [nd for nd in _dirDict if dirName in nd]
-                assert len(_dirDict) == 1, "This should not have happened. Directory not found in repository. Please report issue"
-                _dirDict = _dirDict[0]
-                _newDirDict = [nd for nd in newDirList  if isinstance(nd,dict)]
-                _newDirDict = [nd for nd in _newDirDict if newDirName in nd]
-                assert len(_newDirDict) == 0, "This should not have happened. New directory is found in repository. Please report issue"
+                _dirDict = self.__index.get_directory_dict(relativePath)
+                assert _dirDict is not None, "Given relative path '%s' is not a repository directory"%(relativePath,)
+                assert self.__index.is_directory(newParentRelativePath), "Given new relative path '%s' parent directory is not a repository directory"%(newRelativePath,)
                 # try to copy directory
-                _newDirDict = copy.deepcopy(_dirDict)
-                if dirName != newDirName:
-                    _newDirDict[newDirName] = _newDirDict.pop(dirName)
                 _ = copy_tree(src=realPath, dst=newRealPath, srcDirDict=_dirDict,
                               filAttr = [self.__fileInfo,self.__fileClass],
-                              dirAttr = [self.__dirInfo,self.__repoFile])
+                              dirAttr = [self.__dirInfo,self.__repoFile,self.__filesInfo])
                 #_ = copy_tree(realPath, newRealPath)
                 # update newDirList
-                newDirList.append(_newDirDict)
+                self.__index.copy_directory(relativePath, newRelativePath)
                 # update and dump dirinfo
                 self.__save_dirinfo(description=None, dirInfoPath=newParentRelativePath, create=False)
             except Exception as err:
                 error = str(err)
-                if self.DEBUG_PRINT_FAILED_TRIALS: print("Trial %i failed in Repository.%s (%s). Set Repository.DEBUG_PRINT_FAILED_TRIALS to False to mute"%(_trial, inspect.stack()[1][3], str(error)))
+                self.__failed_trial(_trial, error)
             else:
                 error = None
                 break
+        # save repository along with any added directory
+        _, cerror = self.__commit_walk_repo()
         if error is None:
-            _, error = self.__save_repository_pickle_file(lockFirst=False, raiseError=False)
+            error = cerror
         if dirLockId is not None: self.__locker.release_lock(dirLockId)
         self.__locker.release_lock(repoLockId)
         if newDirLockId is not None: self.__locker.release_lock(newDirLockId)
@@ -2246,11 +3928,363 @@ class Repository(object):
         return error is None, error
 
 
+    @classmethod
+    def register_serializer(cls, name, dump, pull, replace=False):
+        """
+        Register a serializer to be used by name as dump and pull methods.
+        Files dumped with it store its name in their info, therefore it
+        must be registered in every process pulling them.
+
+        :Parameters:
+            #. name (string): Serializer name made of letters, digits and
+               underscores.
+            #. dump (callable): Dump function called as
+               dump(path=path, value=value). It can accept an fsync boolean
+               argument, in which case it must fsync the written file when
+               fsync is True.
+            #. pull (callable): Pull function called as pull(path=path) and
+               returning the pulled value.
+            #. replace (boolean): Whether to replace an already registered
+               serializer of the same name. Built-in serializers can't be
+               replaced.
+        """
+        cls.SERIALIZERS.register(name, dump=dump, pull=pull, replace=replace)
+
+    @classmethod
+    def unregister_serializer(cls, name):
+        """
+        Unregister a serializer. Files dumped with it can then only be
+        pulled by giving a pull method.
+
+        :Parameters:
+            #. name (string): Serializer name.
+        """
+        cls.SERIALIZERS.unregister(name)
+
+    def __to_serializer_method(self, method, kind):
+        """normalize a dump or pull method to the string stored in file info.
+        None is 'pickle', 'pickle' dump is given the default protocol,
+        serializers names are kept and anything else is considered code"""
+        if method is None:
+            method = 'pickle'
+        assert isinstance(method, basestring), "%s must be None or a string"%(kind,)
+        if kind == 'dump' and method == 'pickle':
+            method = 'pickle%i'%self._DEFAULT_PICKLE_PROTOCOL
+        if self.SERIALIZERS.is_name(method):
+            assert method in self.SERIALIZERS, "serializer '%s' is not registered"%(method,)
+        return method
+
+    def __get_serializer_function(self, method, kind, description=None):
+        """get dump or pull function from registered serializer name or
+        compiled code string"""
+        if method is None:
+            method = 'pickle'
+        func = self.SERIALIZERS.get(method, kind)
+        if func is None:
+            assert not self.SERIALIZERS.is_name(method), "serializer '%s' is not registered"%(method,)
+            if description is None:
+                description = kind
+            func = self.METHODS_CACHE.get(method, name=kind, description=description)
+        return func
+
+    def __get_dump_pull_methods(self, dump, pull, value=None):
+        """normalize dump and pull methods to serializers names or code strings.
+        'auto' dump is resolved to value's fastest serializer"""
+        if dump == 'auto':
+            dump = get_auto_serializer(value)
+        if pull is None and dump is not None and dump in self.SERIALIZERS:
+            pull = dump
+        pull = self.__to_serializer_method(pull, 'pull')
+        dump = self.__to_serializer_method(dump, 'dump')
+        return dump, pull
+
+    def __get_dump_error(self, value, dump, err):
+        """get dump error message with pickling errors info if any"""
+        error = "unable to dump the file (%s)"%(str(err),)
+        try:
+            if dump.startswith('pickle') or 'pickle.dump(' in dump:
+                mi = get_pickling_errors(value)
+                if mi is not None:
+                    error += '\nmore info: %s'%str(mi)
+        except:
+            pass
+        return error
+
+    def __dump_temporary(self, value, relativePath, dump, durability=None):
+        """serialize value to a temporary file without acquiring any lock.
+        Temporary file is created in the file directory or its nearest
+        existing parent directory, missing directories are only created
+        holding the locks. Returns temporary path and error"""
+        fPath, fName = os.path.split(os.path.join(self.__path,relativePath))
+        while not os.path.isdir(fPath) and len(fPath)>len(self.__path):
+            fPath = os.path.dirname(fPath)
+        try:
+            dumpFunc = self.__get_serializer_function(dump, 'dump')
+            tmpPath  = dump_temporary(dumpFunc, path=os.path.join(fPath,fName), value=value, fsync=self.__get_fsync(durability)[0])
+        except Exception as err:
+            return None, self.__get_dump_error(value, dump, err)
+        return tmpPath, None
+
+    def __dump_file(self, value, relativePath, dump, pull, description, replace, ntrials, track=True, durability=None, tmpPath=None):
+        """dump file along with its info and class files to disk and add it
+        to the in memory tree. Must be called with repository and file locks
+        acquired after __reload_walk_repo. If track is False, file existence
+        is decided from its info on disk and the in memory tree is not
+        touched, then only the file lock is required. If tmpPath is given,
+        value is already serialized to tmpPath which is renamed to file path.
+        Data is written once, failing trials after that only retry writing
+        file info. Buffers sidecar of the replaced data, if any, is removed
+        after data is replaced. Returns error or None"""
+        dataFsync, infoFsync, _ = self.__get_fsync(durability)
+        savePath     = os.path.join(self.__path,relativePath)
+        fPath, fName = os.path.split(savePath)
+        written      = False
+        for _trial in range(ntrials):
+            error = None
+            try:
+                isRepoFile, fileOnDisk, infoOnDisk, classOnDisk = self.is_repository_file(relativePath)
+                if not track:
+                    isRepoFile = infoOnDisk
+                if isRepoFile:
+                    assert replace, "file is a registered repository file. set replace to True to replace"
+                if isRepoFile and fileOnDisk:
+                    info = self.__read_file_info(relativePath)
+                    assert info['repository_unique_name'] == self.__repo['repository_unique_name'], "it seems that file was created by another repository"
+                    info['last_update_utctime'] = time.time()
+                else:
+                    info = {'repository_unique_name':self.__repo['repository_unique_name']}
+                    info['create_utctime'] = info['last_update_utctime'] = time.time()
+                oldBuffers = info.get('buffers', None)
+                info['dump'] = dump
+                info['pull'] = pull
+                info['description'] = description
+                # dump file
+                if not written:
+                    if tmpPath is None or not os.path.isfile(tmpPath):
+                        # temporary file parent directory may have been removed
+                        dumpFunc = self.__get_serializer_function(dump, 'dump')
+                        buffers  = atomic_dump(dumpFunc, path=savePath, value=value, fsync=dataFsync)
+                    else:
+                        buffers  = atomic_replace_dumped(tmpPath, savePath, fsync=dataFsync)
+                    written = True
+                    if buffers is not None or oldBuffers:
+                        remove_buffers(savePath, keep=buffers)
+                info['buffers'] = buffers
+                # update info and class
+                if value is None:
+                    klass = None
+                else:
+                    klass = value.__class__
+                self.__write_file_info(relativePath, info=info, klass=klass, fsync=infoFsync)
+                # add to repo if file is new and not being replaced
+                if track and not isRepoFile:
+                    self.__index.add_file(relativePath)
+            except Exception as err:
+                error = self.__get_dump_error(value, dump, err)
+                self.__failed_trial(_trial, error)
+            else:
+                error = None
+                break
+        return error
+
+    def __dump_file_in_repository(self, value, relativePath, dump, pull, description, replace, ntrials, durability=None, tmpPath=None):
+        """dump file in 'repository' LOCKING_MODE holding repository and
+        file locks. Missing directories are added holding the same
+        repository lock, so the file and its directories are saved with a
+        single tree commit. Returns error or None"""
+        savePath = os.path.join(self.__path,relativePath)
+        relDir   = os.path.dirname(relativePath)
+        # lock repository
+        acquired, repoLockId = self.__locker.acquire_lock(path=self.__path, timeout=self.timeout)
+        if not acquired:
+            return "code %s. Unable to aquire the repository lock. You may try again!"%(repoLockId,)
+        fileLockId = None
+        try:
+            # load repository info
+            for _trial in range(ntrials):
+                try:
+                    self.__reload_walk_repo()
+                except Exception as err:
+                    error = str(err)
+                    self.__failed_trial(_trial, error)
+                else:
+                    error = None
+                    break
+            if error is not None:
+                return error
+            # add missing directories within the same lock and tree commit
+            if not self.__index.is_directory(relDir):
+                error = self.__add_directory(relDir, ntrials=ntrials, fsync=self.__get_fsync(durability)[1])
+                if error is not None:
+                    return "Unable to add directory (%s)"%(error,)
+            # lock file and dump it
+            acquired, fileLockId = self.__locker.acquire_lock(path=savePath, timeout=self.timeout)
+            if not acquired:
+                error      = "Code %s. Unable to aquire the lock when dumping '%s'"%(fileLockId,relativePath)
+                fileLockId = None
+            else:
+                error = self.__dump_file(value=value, relativePath=relativePath, dump=dump,
+                                         pull=pull, description=description,
+                                         replace=replace, ntrials=ntrials,
+                                         durability=durability, tmpPath=tmpPath)
+            # save repository along with any added directory
+            _, cerror = self.__commit_walk_repo(fsync=self.__get_fsync(durability)[2])
+            if error is None:
+                error = cerror
+        finally:
+            # release locks
+            if fileLockId is not None:
+                self.__locker.release_lock(fileLockId)
+            self.__locker.release_lock(repoLockId)
+        return error
+
+    def __dump_file_in_directory(self, value, relativePath, dump, pull, description, replace, ntrials, durability=None, tmpPath=None):
+        """dump file in 'directory' LOCKING_MODE. Directory and file locks
+        are acquired at once, then missing directory is created and data and
+        info are written holding those two locks only. File is then added
+        to the tree in a short repository lock critical section. No lock is
+        held while waiting for another one. Returns error or None"""
+        savePath = os.path.join(self.__path,relativePath)
+        fPath    = os.path.dirname(savePath)
+        relDir   = os.path.dirname(relativePath)
+        # lock directory and file. repository root directory lock is the
+        # repository lock, root files are dumped holding their lock only
+        if relDir:
+            lockPath = [fPath, savePath]
+        else:
+            lockPath = savePath
+        acquired, lockId = self.__locker.acquire_lock(path=lockPath, timeout=self.timeout)
+        if not acquired:
+            return "Code %s. Unable to aquire the locks when dumping '%s'"%(lockId,relativePath)
+        # create directory on disk, it's added to the tree upon commit.
+        # then dump file data, info and class
+        try:
+            error = None
+            if not os.path.isdir(fPath):
+                try:
+                    os.makedirs(fPath)
+                except Exception as err:
+                    if not os.path.isdir(fPath):
+                        error = "Unable to create directory '%s' (%s)"%(fPath, err)
+            if error is None:
+                error = self.__dump_file(value=value, relativePath=relativePath, dump=dump,
+                                         pull=pull, description=description,
+                                         replace=replace, ntrials=ntrials, track=False,
+                                         durability=durability, tmpPath=tmpPath)
+        finally:
+            self.__locker.release_lock(lockId)
+        if error is not None:
+            return error
+        # commit file to repository tree
+        _, infoFsync, fsync = self.__get_fsync(durability)
+        return self.__commit_dumped_file(relativePath, fsync=fsync, infoFsync=infoFsync, ntrials=ntrials)
+
+    def __enqueue_commit(self, relativePath, fsync, infoFsync):
+        """write dumped file commit record in commit queue directory.
+        Returns record path"""
+        queuePath = os.path.join(self.__path, self.__commitQueue)
+        if not os.path.isdir(queuePath):
+            try:
+                os.makedirs(queuePath)
+            except OSError:
+                if not os.path.isdir(queuePath):
+                    raise
+        recordPath = os.path.join(queuePath, self.__commitRecord%uuid.uuid4().hex)
+        record     = {'file':relativePath, 'fsync':fsync, 'info_fsync':infoFsync}
+        atomic_write(recordPath, pickle.dumps(record, protocol=self._DEFAULT_PICKLE_PROTOCOL), fsync=False)
+        return recordPath
+
+    def __read_commit_queue(self):
+        """read all commit queue records as a list of (path, record)"""
+        queuePath = os.path.join(self.__path, self.__commitQueue)
+        entries   = list_directory(queuePath) or {}
+        records   = []
+        for name in sorted(entries):
+            if not name.endswith(self.__commitRecord[3:]):
+                continue
+            path = os.path.join(queuePath, name)
+            try:
+                with open(path, 'rb') as fd:
+                    records.append( (path, pickle.load(fd)) )
+            except Exception:
+                continue
+        return records
+
+    def __commit_dumped_file(self, relativePath, fsync, infoFsync, ntrials):
+        """add a dumped file to the repository tree in a repository lock
+        critical section. If GROUP_COMMIT is True, file is first queued and
+        the repository lock holder commits all queued files at once. A file
+        is committed if its queue record was removed. Returns error or None"""
+        recordPath = None
+        if self.GROUP_COMMIT:
+            try:
+                recordPath = self.__enqueue_commit(relativePath, fsync=fsync, infoFsync=infoFsync)
+            except Exception as err:
+                return "Unable to queue dumped file '%s' commit (%s)"%(relativePath, err)
+        acquired, repoLockId = self.__locker.acquire_lock(path=self.__path, timeout=self.timeout)
+        if not acquired:
+            error = "code %s. Unable to aquire the repository lock to add dumped file '%s'. You may try again!"%(repoLockId,relativePath)
+            if recordPath is not None:
+                try:
+                    os.remove(recordPath)
+                except OSError:
+                    if not os.path.isfile(recordPath):
+                        error = None
+            return error
+        try:
+            # already committed by another lock holder
+            if recordPath is not None and not os.path.isfile(recordPath):
+                return None
+            for _trial in range(ntrials):
+                try:
+                    self.__reload_walk_repo()
+                    if recordPath is None:
+                        records = [(None, {'file':relativePath, 'fsync':fsync, 'info_fsync':infoFsync})]
+                    else:
+                        records = self.__read_commit_queue()
+                    committed = []
+                    for path, record in records:
+                        try:
+                            rpath  = record['file']
+                            relDir = os.path.dirname(rpath)
+                            # file can be removed by another process meanwhile
+                            if not os.path.isfile(os.path.join(self.__path, rpath)):
+                                committed.append(path)
+                                continue
+                            if not self.__index.is_directory(relDir):
+                                error = self.__add_directory(relDir, ntrials=ntrials, fsync=record.get('info_fsync', None))
+                                assert error is None, error
+                            if not self.__index.is_file(rpath):
+                                self.__index.add_file(rpath)
+                        except Exception as err:
+                            # only the record writer gives up its record
+                            assert path != recordPath, err
+                        else:
+                            committed.append(path)
+                    saved, error = self.__commit_walk_repo(fsync=any([r.get('fsync', True) for _, r in records]))
+                    assert saved, error
+                    for path in committed:
+                        if path is not None and os.path.isfile(path):
+                            os.remove(path)
+                except Exception as err:
+                    error = str(err)
+                    self.__failed_trial(_trial, error)
+                else:
+                    error = None
+                    break
+            if error is not None and recordPath is not None and os.path.isfile(recordPath):
+                os.remove(recordPath)
+        finally:
+            self.__locker.release_lock(repoLockId)
+        return error
+
     @path_required
+    @writable_required
+    @lock_operation
     def dump_file(self, value, relativePath,
                         description=None,
                         dump=None, pull=None,
-                        replace=False, raiseError=True, ntrials=3):
+                        replace=False, raiseError=True, ntrials=3, durability=None):
         """
         Dump a file using its value to the system and creates its
         attribute in the Repository with utc timestamp.
@@ -2264,18 +4298,36 @@ class Repository(object):
             #. dump (None, string): The dumping method.
                If None it will be set automatically to pickle and therefore the
                object must be pickleable. If a string is given, it can be a
-               keyword ('json','pickle','dill') or a string compileable code to
-               dump the data. The string code must include all the necessary
-               imports and a '$FILE_PATH' that replaces the absolute file path
-               when the dumping will be performed.\n
-               e.g. "import numpy as np; np.savetxt(fname='$FILE_PATH', X=value, fmt='%.6e')"
+               registered serializer name ('json','pickle','pickle5_oob',
+               'dill','numpy','numpy_mmap','numpy_text','bytes' or any name
+               added with register_serializer), 'auto' or a string
+               compileable code to dump the data. 'auto' picks the fastest
+               suitable serializer for value type, raw 'bytes' for bytes,
+               bytearray and memoryview, 'numpy' for numpy arrays and highest
+               protocol pickle otherwise, see get_auto_serializer. The picked
+               serializer is stored in file info and used as pull method if
+               pull is None. bytearray and memoryview are pulled as bytes. The string code must include
+               all the necessary imports and a '$FILE_PATH' that replaces the
+               absolute file path when the dumping will be performed.\n
+               e.g. "import numpy as np; np.savetxt(fname='$FILE_PATH', X=value, fmt='%.6e')"\n
+               Data is dumped to a temporary file next to the final one which
+               is then atomically renamed, therefore the dump code must write
+               to the exact given path.
             #. pull (None, string): The pulling method. If None it will be set
                automatically to pickle and therefore the object must be
-               pickleable. If a string is given, it can be a keyword
-               ('json','pickle','dill') or a string compileable code to pull
-               the data. The string code must include all the necessary imports,
-               a '$FILE_PATH' that replaces the absolute file path when the
-               dumping will be performed and finally a PULLED_DATA variable.\n
+               pickleable. If a string is given, it can be a registered
+               serializer name ('json','pickle','pickle5_oob','dill','numpy',
+               'numpy_mmap','numpy_text','bytes' or any name added with
+               register_serializer) or a string compileable code to pull the
+               data. 'pickle5_oob' pickles with protocol 5 and writes numpy
+               arrays and other contiguous buffers out-of-band to a page
+               aligned sidecar file, which is memory mapped copy-on-write
+               upon pulling so arrays are not copied nor read until used. 'numpy_mmap' pulls a read-only
+               numpy.memmap of the stored .npy file instead of reading the
+               whole array in memory. The string code must include all the
+               necessary imports, a '$FILE_PATH' that replaces the absolute
+               file path when the dumping will be performed and finally a
+               PULLED_DATA variable.\n
                e.g "import numpy as np; PULLED_DATA=np.loadtxt(fname='$FILE_PATH')"
             #. replace (boolean): Whether to replace any existing file.
             #. raiseError (boolean): Whether to raise encountered error instead
@@ -2288,6 +4340,9 @@ class Repository(object):
                of some other process. Bigger number of trials lowers the
                likelyhood of failure due to multiple processes same time
                alteration.
+            #. durability (None, string): Which writes are fsynced for this
+               dump. If None, repository durability is used. See durability
+               property.
 
         :Returns:
             #. success (boolean): Whether renaming the directory was successful.
@@ -2303,11 +4358,7 @@ class Repository(object):
             description = ''
         assert isinstance(description, basestring), "description must be None or a string"
         # convert dump and pull methods to strings
-        if pull is None and dump is not None:
-            if dump.startswith('pickle') or dump.startswith('dill') or dump.startswith('numpy') or dump =='json':
-                pull = dump
-        dump = get_dump_method(dump, protocol=self._DEFAULT_PICKLE_PROTOCOL)
-        pull = get_pull_method(pull)
+        dump, pull = self.__get_dump_pull_methods(dump=dump, pull=pull, value=value)
         # check name and path
         relativePath = self.to_repo_relative_path(path=relativePath, split=False)
         savePath     = os.path.join(self.__path,relativePath)
@@ -2317,116 +4368,162 @@ class Repository(object):
         if not success:
             assert not raiseError, reason
             return False, reason
-        # ensure directory added
+        assert self.LOCKING_MODE in ('repository','directory'), "LOCKING_MODE must be 'repository' or 'directory'"
+        # serialize value before acquiring any lock
+        tmpPath = None
+        if self.DUMP_OUTSIDE_LOCK:
+            # fail early on an existing file, it's checked again under the locks
+            if not replace and self.__index.is_file(relativePath) and os.path.isfile(savePath):
+                error = "file is a registered repository file. set replace to True to replace"
+                assert not raiseError, "unable to dump file '%s' (%s)"%(relativePath, error,)
+                return False, error
+            tmpPath, error = self.__dump_temporary(value=value, relativePath=relativePath,
+                                                   dump=dump, durability=durability)
+            if error is not None:
+                assert not raiseError, error
+                return False, error
         try:
-            success, reason = self.add_directory(fPath, raiseError=False, ntrials=ntrials)
-        except Exception as err:
-            reason  = "Unable to add directory (%s)"%(str(err))
-            success = False
-        if not success:
-            assert not raiseError, reason
-            return False, reason
+            if self.LOCKING_MODE == 'directory':
+                # dump holding directory and file locks
+                error = self.__dump_file_in_directory(value=value, relativePath=relativePath,
+                                                      dump=dump, pull=pull, description=description,
+                                                      replace=replace, ntrials=ntrials,
+                                                      durability=durability, tmpPath=tmpPath)
+            else:
+                # dump holding repository and file locks
+                error = self.__dump_file_in_repository(value=value, relativePath=relativePath,
+                                                       dump=dump, pull=pull, description=description,
+                                                       replace=replace, ntrials=ntrials,
+                                                       durability=durability, tmpPath=tmpPath)
+        finally:
+            if tmpPath is not None:
+                remove_temporary(tmpPath)
+        # check and return
+        assert not raiseError or error is None, "unable to dump file '%s' after %i trials (%s)"%(relativePath, ntrials, error,)
+        return error is None, error
+
+    def dump(self, *args, **kwargs):
+        """Alias to dump_file"""
+        return self.dump_file(*args, **kwargs)
+
+    @path_required
+    @writable_required
+    @lock_operation
+    def dump_files(self, items, replace=False, raiseError=True, ntrials=3, durability=None):
+        """
+        Dump many files at once. Unlike calling dump_file for every file,
+        the repository lock is acquired once, all missing directories are
+        created, all files are dumped and the repository tree is saved
+        once.
+
+        :Parameters:
+            #. items (list): List of (value, relativePath, dump, pull, description)
+               tuples. dump, pull and description are optional and can be
+               omitted or set to None. See dump_file for their definition.
+            #. replace (boolean): Whether to replace any existing file.
+            #. raiseError (boolean): Whether to raise encountered error instead
+               of returning failure. Error is raised after all items are
+               processed and successfully dumped files are saved.
+            #. ntrials (int): After aquiring all locks, ntrials is the maximum
+               number of trials allowed before failing.
+               In rare cases, when multiple processes
+               are accessing the same repository components, different processes
+               can alter repository components between successive lock releases
+               of some other process. Bigger number of trials lowers the
+               likelyhood of failure due to multiple processes same time
+               alteration.
+            #. durability (None, string): Which writes are fsynced for this
+               dump. If None, repository durability is used. See durability
+               property.
+
+        :Returns:
+            #. success (boolean): Whether all files were successfully dumped.
+            #. results (list): List of (success, message) tuples for every
+               item in the same order as items.
+        """
+        assert isinstance(raiseError, bool), "raiseError must be boolean"
+        assert isinstance(replace, bool), "replace must be boolean"
+        assert isinstance(ntrials, int), "ntrials must be integer"
+        assert ntrials>0, "ntrials must be >0"
+        assert isinstance(items, (list,tuple)), "items must be a list"
+        # check items
+        results  = [None]*len(items)
+        prepared = []
+        for idx, item in enumerate(items):
+            try:
+                assert isinstance(item, (list,tuple)), "item must be a tuple"
+                assert 2<=len(item)<=5, "item must be a tuple of 2 to 5 values"
+                value, relativePath, dump, pull, description = (tuple(item)+(None,None,None))[:5]
+                if description is None:
+                    description = ''
+                assert isinstance(description, basestring), "description must be None or a string"
+                assert isinstance(relativePath, basestring), "relativePath must be a string"
+                dump, pull   = self.__get_dump_pull_methods(dump=dump, pull=pull, value=value)
+                relativePath = self.to_repo_relative_path(path=relativePath, split=False)
+                allowed, reason = self.is_name_allowed(relativePath)
+                assert allowed, reason
+            except Exception as err:
+                results[idx] = (False, str(err))
+            else:
+                prepared.append( (idx, value, relativePath, dump, pull, description) )
         # lock repository
         acquired, repoLockId = self.__locker.acquire_lock(path=self.__path, timeout=self.timeout)
         if not acquired:
             m = "code %s. Unable to aquire the repository lock. You may try again!"%(repoLockId,)
             assert not raiseError, m
-            return False,m
-        # lock file
-        acquired, fileLockId = self.__locker.acquire_lock(path=savePath, timeout=self.timeout)
-        if not acquired:
-            self.__locker.release_lock(repoLockId)
-            error = "Code %s. Unable to aquire the lock when dumping '%s'"%(fileLockId,relativePath)
-            assert not raiseError, error
-            return False, error
+            return False, [r if r is not None else (False,m) for r in results]
         # load repository info
         for _trial in range(ntrials):
             try:
-                repo = self.__load_repository_pickle_file(os.path.join(self.__path, self.__repoFile))
-                self.__repo['walk_repo'] = repo['walk_repo']
+                self.__reload_walk_repo()
             except Exception as err:
                 error = str(err)
-                if self.DEBUG_PRINT_FAILED_TRIALS: print("Trial %i failed in Repository.%s (%s). Set Repository.DEBUG_PRINT_FAILED_TRIALS to False to mute"%(_trial, inspect.stack()[1][3], str(error)))
+                self.__failed_trial(_trial, error)
             else:
                 error = None
                 break
         if error is not None:
-            self.__locker.release_lock(dirLockId)
-            self.__locker.release_lock(fileLockId)
+            self.__locker.release_lock(repoLockId)
             assert not raiseError, Exception(error)
-            return False, error
-        # dump file
-        for _trial in range(ntrials):
-            error = None
-            try:
-                isRepoFile, fileOnDisk, infoOnDisk, classOnDisk = self.is_repository_file(relativePath)
-                if isRepoFile:
-                    assert replace, "file is a registered repository file. set replace to True to replace"
-                fileInfoPath = os.path.join(self.__path,os.path.dirname(relativePath),self.__fileInfo%fName)
-                if isRepoFile and fileOnDisk:
-                    with open(fileInfoPath, 'rb') as fd:
-                        info = pickle.load(fd)
-                    assert info['repository_unique_name'] == self.__repo['repository_unique_name'], "it seems that file was created by another repository"
-                    info['last_update_utctime'] = time.time()
-                else:
-                    info = {'repository_unique_name':self.__repo['repository_unique_name']}
-                    info['create_utctime'] = info['last_update_utctime'] = time.time()
-                info['dump'] = dump
-                info['pull'] = pull
-                info['description'] = description
-                # get parent directory list if file is new and not being replaced
-                if not isRepoFile:
-                    dirList = self.__get_repository_directory(fPath)
-                # dump file
-                dumpFunc = my_exec( dump, name='dump', description='dump')
-                dumpFunc(path=str(savePath), value=value)
-                # update info
-                with open(fileInfoPath, 'wb') as fd:
-                    pickle.dump( info,fd, protocol=self._DEFAULT_PICKLE_PROTOCOL)
-                    fd.flush()
-                    os.fsync(fd.fileno())
-                # update class file
-                fileClassPath = os.path.join(self.__path,os.path.dirname(relativePath),self.__fileClass%fName)
-                with open(fileClassPath, 'wb') as fd:
-                    if value is None:
-                        klass = None
-                    else:
-                        klass = value.__class__
-                    pickle.dump(klass , fd, protocol=self._DEFAULT_PICKLE_PROTOCOL )
-                    fd.flush()
-                    os.fsync(fd.fileno())
-                # add to repo if file is new and not being replaced
-                if not isRepoFile:
-                    dirList.append(fName)
-            except Exception as err:
-                error = "unable to dump the file (%s)"%(str(err),)
-                try:
-                    if 'pickle.dump(' in dump:
-                        mi = get_pickling_errors(value)
-                        if mi is not None:
-                            error += '\nmore info: %s'%str(mi)
-                except:
-                    pass
-                if self.DEBUG_PRINT_FAILED_TRIALS: print("Trial %i failed in Repository.%s (%s). Set Repository.DEBUG_PRINT_FAILED_TRIALS to False to mute"%(_trial, inspect.stack()[1][3], str(error)))
-            else:
-                error = None
-                break
+            return False, [r if r is not None else (False,error) for r in results]
+        # create directories
+        dirErrors = {}
+        for _, _, relativePath, _, _, _ in prepared:
+            relDir = os.path.dirname(relativePath)
+            if relDir in dirErrors or self.__index.is_directory(relDir):
+                continue
+            dirErrors[relDir] = self.__add_directory(relDir, ntrials=ntrials, fsync=self.__get_fsync(durability)[1])
+        # dump files
+        for idx, value, relativePath, dump, pull, description in prepared:
+            error = dirErrors.get(os.path.dirname(relativePath), None)
+            if error is not None:
+                results[idx] = (False, "Unable to add directory (%s)"%(error,))
+                continue
+            acquired, fileLockId = self.__locker.acquire_lock(path=os.path.join(self.__path,relativePath), timeout=self.timeout)
+            if not acquired:
+                results[idx] = (False, "Code %s. Unable to aquire the lock when dumping '%s'"%(fileLockId,relativePath))
+                continue
+            error = self.__dump_file(value=value, relativePath=relativePath, dump=dump,
+                                     pull=pull, description=description,
+                                     replace=replace, ntrials=ntrials,
+                                     durability=durability)
+            self.__locker.release_lock(fileLockId)
+            results[idx] = (error is None, error)
         # save repository
-        if error is None:
-            _, error = self.__save_repository_pickle_file(lockFirst=False, raiseError=False)
-        # release locks
-        self.__locker.release_lock(fileLockId)
+        _, error = self.__commit_walk_repo(fsync=self.__get_fsync(durability)[2])
+        if error is not None:
+            results = [(False,error) if r[0] else r for r in results]
+        # release lock
         self.__locker.release_lock(repoLockId)
         # check and return
-        assert not raiseError or error is None, "unable to dump file '%s' after %i trials (%s)"%(relativePath, ntrials, error,)
-        return success, error
-
-    def dump(self, *args, **kwargs):
-        """Alias to dump_file"""
-        return self.dump_file(*args, **kwargs)
+        failed = ["'%s' (%s)"%(items[idx][1] if isinstance(items[idx], (list,tuple)) and len(items[idx])>1 else idx, r[1]) for idx, r in enumerate(results) if not r[0]]
+        assert not raiseError or not len(failed), "unable to dump %i files out of %i: %s"%(len(failed), len(items), ', '.join(failed))
+        return not len(failed), results
 
 
     @path_required
+    @writable_required
+    @lock_operation
     def copy_file(self, relativePath, newRelativePath,
                         force=False, raiseError=True, ntrials=3):
         """
@@ -2468,26 +4565,50 @@ class Repository(object):
         newRelativePath = self.to_repo_relative_path(path=newRelativePath, split=False)
         newRealPath     = os.path.join(self.__path,newRelativePath)
         nfPath, nfName  = os.path.split(newRealPath)
+        # lock repository
+        acquired, repoLockId = self.__locker.acquire_lock(path=self.__path, timeout=self.timeout)
+        if not acquired:
+            error = "code %s. Unable to aquire the repository lock. You may try again!"%(repoLockId,)
+            assert not raiseError, error
+            return False, error
+        # load repository info
+        for _trial in range(ntrials):
+            try:
+                self.__reload_walk_repo()
+            except Exception as err:
+                error = str(err)
+                self.__failed_trial(_trial, error)
+            else:
+                error = None
+                break
+        if error is not None:
+            self.__locker.release_lock(repoLockId)
+            assert not raiseError, error
+            return False, error
+        # add new file missing directories within the same lock and tree commit
+        newRelDir = os.path.dirname(newRelativePath)
+        if not self.__index.is_directory(newRelDir):
+            error = self.__add_directory(newRelDir, ntrials=ntrials)
+            if error is not None:
+                self.__commit_walk_repo()
+                self.__locker.release_lock(repoLockId)
+                error = "Unable to add directory (%s)"%(error,)
+                assert not raiseError, error
+                return False, error
         # lock old file
         acquired, fileLockId = self.__locker.acquire_lock(path=realPath, timeout=self.timeout)
         if not acquired:
+            self.__commit_walk_repo()
+            self.__locker.release_lock(repoLockId)
             error = "Code %s. Unable to aquire the lock for old file '%s'"%(fileLockId,relativePath)
             assert not raiseError, error
             return False, error
-        # add new file diretory
-        try:
-            success, reason = self.add_directory(nfPath, raiseError=False, ntrials=ntrials)
-        except Exception as err:
-            reason  = "Unable to add directory (%s)"%(str(err))
-            success = False
-        if not success:
-            self.__locker.release_lock(fileLockId)
-            assert not raiseError, reason
-            return False, reason
         # create new file lock
         acquired, newFileLockId = self.__locker.acquire_lock(path=newRealPath, timeout=self.timeout)
         if not acquired:
-            self.__locker.release_lock(fileLlockId)
+            self.__commit_walk_repo()
+            self.__locker.release_lock(fileLockId)
+            self.__locker.release_lock(repoLockId)
             error = "Code %s. Unable to aquire the lock for new file path '%s'"%(newFileLockId,newRelativePath)
             assert not raiseError, error
             return False, error
@@ -2505,41 +4626,41 @@ class Repository(object):
                 # get new file path
                 nisRepoFile,nfileOnDisk,ninfoOnDisk,nclassOnDisk = self.is_repository_file(newRelativePath)
                 assert not nisRepoFile or force, "New file path is a registered repository file, set force to True to proceed regardless"
-                # get parent directories list
-                nDirList = self.__get_repository_directory(nfPath)
                 # remove new file and all repository files from disk
                 if os.path.isfile(newRealPath):
                     os.remove(newRealPath)
-                if os.path.isfile(os.path.join(nfPath,self.__fileInfo%nfName)):
-                    os.remove(os.path.join(nfPath,self.__fileInfo%nfName))
-                if os.path.isfile(os.path.join(nfPath,self.__fileClass%nfName)):
-                    os.remove(os.path.join(nfPath,self.__fileClass%nfName))
                 # move old file to new path
                 shutil.copy(realPath, newRealPath)
-                shutil.copy(os.path.join(fPath,self.__fileInfo%fName),  os.path.join(nfPath,self.__fileInfo%nfName))
-                shutil.copy(os.path.join(fPath,self.__fileClass%fName), os.path.join(nfPath,self.__fileClass%nfName))
+                self.__copy_file_info(relativePath, newRelativePath, move=False)
                 # update new list
-                if nfName not in nDirList:
-                    nDirList.append(nfName)
+                if not nisRepoFile:
+                    self.__index.add_file(newRelativePath)
             except Exception as err:
                 copied = False
                 error = str(err)
-                if self.DEBUG_PRINT_FAILED_TRIALS: print("Trial %i failed in Repository.%s (%s). Set Repository.DEBUG_PRINT_FAILED_TRIALS to False to mute"%(_trial, inspect.stack()[1][3], str(error)))
+                self.__failed_trial(_trial, error)
             else:
                 error = None
                 copied = True
                 break
+        # save repository along with any added directory
+        _, cerror = self.__commit_walk_repo()
+        if copied and cerror is not None:
+            copied, error = False, cerror
         # release locks
         self.__locker.release_lock(fileLockId)
         self.__locker.release_lock(newFileLockId)
+        self.__locker.release_lock(repoLockId)
         # check and return
         assert copied or not raiseError, "Unable to copy file '%s' to '%s' after %i trials (%s)"%(relativePath, newRelativePath, ntrials, error,)
-        return copied, '\n'.join(message)
+        return copied, error
 
 
     @path_required
+    @writable_required
+    @lock_operation
     def update_file(self, value, relativePath, description=False,
-                          dump=False, pull=False, raiseError=True, ntrials=3):
+                          dump=False, pull=False, raiseError=True, ntrials=3, durability=None):
         """
         Update the value of a file that is already in the Repository.\n
         If file is not registered in repository, and error will be thrown.\n
@@ -2555,10 +4676,13 @@ class Repository(object):
             #. description (False, string): Any random description about the file.
                If False is given, the description info won't be updated,
                otherwise it will be update to what description argument value is.
-            #. dump (False, string): The new dump method. If False is given,
-               the old one will be used.
-            #. pull (False, string): The new pull method. If False is given,
-               the old one will be used.
+            #. dump (False, None, string): The new dump method. If False is
+               given, the old one will be used. Otherwise it is the same as
+               dump_file dump argument.
+            #. pull (False, None, string): The new pull method. If False is
+               given, the old one will be used unless dump is 'auto', in
+               which case the picked serializer is used. Otherwise it is the
+               same as dump_file pull argument.
             #. raiseError (boolean): Whether to raise encountered error instead
                of returning failure.
             #. ntrials (int): After aquiring all locks, ntrials is the maximum
@@ -2569,6 +4693,9 @@ class Repository(object):
                of some other process. Bigger number of trials lowers the
                likelyhood of failure due to multiple processes same time
                alteration.
+            #. durability (None, string): Which writes are fsynced for this
+               update. If None, repository durability is used. See durability
+               property.
 
        :Returns:
            #. success (boolean): Whether renaming the directory was successful.
@@ -2582,6 +4709,7 @@ class Repository(object):
         assert pull is False or pull is None or isinstance(pull, basestring), "pull must be False, None or a string"
         assert isinstance(ntrials, int), "ntrials must be integer"
         assert ntrials>0, "ntrials must be >0"
+        dataFsync, infoFsync, _ = self.__get_fsync(durability)
         # get name and path
         relativePath = self.to_repo_relative_path(path=relativePath, split=False)
         savePath     = os.path.join(self.__path,relativePath)
@@ -2609,9 +4737,8 @@ class Repository(object):
                     info['repository_unique_name'] = self.__repo['repository_unique_name']
                     info['create_utctime'] = info['last_update_utctime'] = time.time()
                 else:
-                    with open(os.path.join(fPath,self.__fileInfo%fName), 'rb') as fd:
-                        info = pickle.load(fd)
-                        info['last_update_utctime'] = time.time()
+                    info = self.__read_file_info(relativePath)
+                    info['last_update_utctime'] = time.time()
                 if not fileOnDisk:
                     message.append("file %s is registered in repository but it was found on disk prior to updating"%relativePath)
                 if not infoOnDisk:
@@ -2626,47 +4753,39 @@ class Repository(object):
                         description = ''
                     if dump is False:
                         dump = info['dump']
-                    elif dump is None:
-                        dump = get_dump_method(dump, protocol=self._DEFAULT_PICKLE_PROTOCOL)
-                    if pull is False:
+                    if pull is False and dump != 'auto':
                         pull = info['pull']
-                    elif pull is None:
-                        pull = get_pull_method(pull)
+                if dump == 'auto':
+                    dump = get_auto_serializer(value)
+                    if pull in (None, False):
+                        pull = dump
+                if dump is not info.get('dump', None):
+                    dump = self.__to_serializer_method(dump, 'dump')
+                if pull is not info.get('pull', None):
+                    pull = self.__to_serializer_method(pull, 'pull')
                 # update dump, pull and description
                 info['dump'] = dump
                 info['pull'] = pull
                 info['description'] = description
                 # dump file
-                dumpFunc = my_exec( dump, name='dump', description='update')
-                dumpFunc(path=str(savePath), value=value)
-                # remove file if exists
-                _path = os.path.join(fPath,self.__fileInfo%fName)
-                # update info
-                with open(_path, 'wb') as fd:
-                    pickle.dump( info,fd, protocol=self._DEFAULT_PICKLE_PROTOCOL )
-                    fd.flush()
-                    os.fsync(fd.fileno())
-                # update class file
-                fileClassPath = os.path.join(self.__path,os.path.dirname(relativePath),self.__fileClass%fName)
-                with open(fileClassPath, 'wb') as fd:
-                    if value is None:
-                        klass = None
-                    else:
-                        klass = value.__class__
-                    pickle.dump(klass , fd, protocol=self._DEFAULT_PICKLE_PROTOCOL )
-                    fd.flush()
-                    os.fsync(fd.fileno())
+                dumpFunc = self.__get_serializer_function(dump, 'dump', description='update')
+                try:
+                    buffers = atomic_dump(dumpFunc, path=savePath, value=value, fsync=dataFsync)
+                except Exception as err:
+                    raise Exception(self.__get_dump_error(value, dump, err))
+                if buffers is not None or info.get('buffers', None):
+                    remove_buffers(savePath, keep=buffers)
+                info['buffers'] = buffers
+                # update info and class
+                if value is None:
+                    klass = None
+                else:
+                    klass = value.__class__
+                self.__write_file_info(relativePath, info=info, klass=klass, fsync=infoFsync)
             except Exception as err:
                 message.append(str(err))
                 updated = False
-                try:
-                    if 'pickle.dump(' in dump:
-                        mi = get_pickling_errors(value)
-                        if mi is not None:
-                            message.append('more info: %s'%str(mi))
-                except:
-                    pass
-                if self.DEBUG_PRINT_FAILED_TRIALS: print("Trial %i failed in Repository.%s (%s). Set Repository.DEBUG_PRINT_FAILED_TRIALS to False to mute"%(_trial, inspect.stack()[1][3], '\n'.join(message)))
+                self.__failed_trial(_trial, '\n'.join(message))
             else:
                 updated = True
                 break
@@ -2682,7 +4801,8 @@ class Repository(object):
 
 
     @path_required
-    def pull_file(self, relativePath, pull=None, update=True, ntrials=3):
+    @lock_operation
+    def pull_file(self, relativePath, pull=None, update=True, ntrials=3, optimistic=False):
         """
         Pull a file's data from the Repository.
 
@@ -2691,10 +4811,16 @@ class Repository(object):
                where to pull the file.
             #. pull (None, string): The pulling method.
                If None, the pull method saved in the file info will be used.
-               If a string is given, the string should include all the necessary
+               If a string is given, it can be a keyword as in dump_file or
+               the string should include all the necessary
                imports, a '$FILE_PATH' that replaces the absolute file path when
                the dumping will be performed and finally a PULLED_DATA variable.
                e.g "import numpy as np; PULLED_DATA=np.loadtxt(fname='$FILE_PATH')"
+               Using 'numpy_mmap' on a file dumped with 'numpy' returns a
+               read-only numpy.memmap sharing the system page cache with all
+               processes mapping the same file. The mapping is not protected
+               by the file lock once returned and must be dropped before the
+               file is updated or removed.
             #. update (boolean): If pull is not None, Whether to update the pull
                method stored in the file info by the given pull method.
             #. ntrials (int): After aquiring all locks, ntrials is the maximum
@@ -2707,12 +4833,20 @@ class Repository(object):
                alteration.
              #. raiseNotRegistered (boolean): whether to raise an error if relativePath
                 is not a repoFile
+            #. optimistic (boolean): Whether to pull without acquiring the
+               file lock. File version stamp made of its info
+               'last_update_utctime' and data file inode, size and
+               modification time is read before and after pulling and pulling
+               is retried only when the file was updated meanwhile. After
+               ntrials conflicts, file is pulled under its lock. This is
+               meant for read-mostly repositories where updates are rare.
 
         :Returns:
             #. data (object): The pulled data from the file.
         """
         assert isinstance(ntrials, int), "ntrials must be integer"
         assert ntrials>0, "ntrials must be >0"
+        assert isinstance(optimistic, bool), "optimistic must be boolean"
         # check name and path
         relativePath = self.to_repo_relative_path(path=relativePath, split=False)
         realPath     = os.path.join(self.__path,relativePath)
@@ -2730,6 +4864,18 @@ class Repository(object):
                 warnings.warn("'%s' was not found on disk but pull method is given"%(self.__fileInfo%fName))
             else:
                 raise Exception("File '%s' is registered in repository but the '%s' was not found on disk and pull method is not specified"%(relativePath,(self.__fileInfo%fName)))
+        # try lock free pull first. version stamp needs file info
+        if (optimistic or self.__readonly) and infoOnDisk:
+            code = pull
+            if code is not None:
+                code = self.__to_serializer_method(code, 'pull')
+            success, result = self.__optimistic_pull(relativePath, pull=code, ntrials=ntrials)
+            if success:
+                return result
+            assert not self.__readonly, "After %i trials, failed to pull file '%s' (%s)"%(ntrials,relativePath, result)
+        elif self.__readonly:
+            pullFunc = self.__get_serializer_function(pull, 'pull')
+            return pullFunc(path=str(realPath))
         # lock repository
         acquired, fileLockId = self.__locker.acquire_lock(path=realPath, timeout=self.timeout)
         if not acquired:
@@ -2741,20 +4887,18 @@ class Repository(object):
             try:
                 # get pull method
                 if pull is not None:
-                    pull = get_pull_method(pull)
+                    pull = self.__to_serializer_method(pull, 'pull')
                 else:
-                    with open(os.path.join(fPath,self.__fileInfo%fName), 'rb') as fd:
-                        info = pickle.load(fd)
-                    pull = info['pull']
+                    pull = self.__read_file_info(relativePath)['pull']
                 # try to pull file
-                pullFunc  = my_exec( pull, name='pull', description='pull')
+                pullFunc  = self.__get_serializer_function(pull, 'pull')
                 pulledVal = pullFunc(path=str(realPath))
             except Exception as err:
                 #LF.release_lock()
                 self.__locker.release_lock(fileLockId)
                 m = str(pull).replace("$FILE_PATH", str(realPath) )
                 error = "Unable to pull data using '%s' from file (%s)"%(m,err)
-                if self.DEBUG_PRINT_FAILED_TRIALS: print("Trial %i failed in Repository.%s (%s). Set Repository.DEBUG_PRINT_FAILED_TRIALS to False to mute"%(_trial, inspect.stack()[1][3], str(error)))
+                self.__failed_trial(_trial, error)
             else:
                 break
         # release lock
@@ -2767,8 +4911,171 @@ class Repository(object):
         """Alias to pull_file"""
         return self.pull_file(*args, **kwargs)
 
+    def __get_file_version(self, relativePath):
+        """get file info and version stamp made of info last update time
+        and data file inode, size and modification time. As files are
+        replaced atomically, any update changes the stamp"""
+        info = self.__read_file_info(relativePath)
+        st   = os.stat(os.path.join(self.__path,relativePath))
+        return info, (info.get('last_update_utctime', None), st.st_ino, st.st_size, getattr(st, 'st_mtime_ns', st.st_mtime))
+
+    def __optimistic_pull(self, relativePath, pull, ntrials):
+        """pull file without acquiring its lock. Pulling is retried when the
+        file version stamp changed while pulling. Returns success and
+        pulled value or error"""
+        realPath = os.path.join(self.__path,relativePath)
+        for _trial in range(ntrials):
+            try:
+                info, before = self.__get_file_version(relativePath)
+                code = pull
+                if code is None:
+                    code = info['pull']
+                pullFunc = self.__get_serializer_function(code, 'pull')
+                value    = pullFunc(path=str(realPath))
+                _, after = self.__get_file_version(relativePath)
+            except Exception as err:
+                error = "Unable to pull data from file '%s' (%s)"%(relativePath,err)
+            else:
+                if before == after:
+                    return True, value
+                error = "file '%s' was updated while pulled"%(relativePath,)
+            self.__failed_trial(_trial, error)
+        return False, error
+
+    def __pull_files_chunk(self, chunk, pull, ntrials, optimistic=False):
+        """pull a chunk of (index, relativePath) files acquiring all their
+        locks at once. Returns list of (index, value)"""
+        pulled = []
+        if optimistic or self.__readonly:
+            locked = []
+            for idx, relativePath in chunk:
+                success, value = self.__optimistic_pull(relativePath, pull=pull, ntrials=ntrials)
+                if success:
+                    pulled.append( (idx,value) )
+                else:
+                    locked.append( (idx,relativePath) )
+            chunk = locked
+            if not len(chunk):
+                return pulled
+            assert not self.__readonly, "Unable to pull %i files in readonly mode (%s)"%(len(chunk), value)
+        realPaths = [os.path.join(self.__path,relativePath) for _, relativePath in chunk]
+        acquired, lockId = self.__locker.acquire_lock(path=realPaths, timeout=self.timeout)
+        assert acquired, "Code %s. Unable to aquire the lock when pulling %i files"%(lockId,len(chunk))
+        try:
+            for idx, relativePath in chunk:
+                realPath     = os.path.join(self.__path,relativePath)
+                fPath, fName = os.path.split(realPath)
+                for _trial in range(ntrials):
+                    error = None
+                    try:
+                        code = pull
+                        if code is None:
+                            code = self.__read_file_info(relativePath)['pull']
+                        pullFunc = self.__get_serializer_function(code, 'pull')
+                        value    = pullFunc(path=str(realPath))
+                    except Exception as err:
+                        error = "Unable to pull data from file '%s' (%s)"%(relativePath,err)
+                        self.__failed_trial(_trial, error)
+                    else:
+                        break
+                assert error is None, "After %i trials, %s"%(ntrials, error)
+                pulled.append( (idx,value) )
+        finally:
+            self.__locker.release_lock(lockId)
+        return pulled
 
     @path_required
+    @lock_operation
+    def pull_files(self, relativePaths, pull=None, workers=4, chunksize=None,
+                         generator=False, ntrials=3, optimistic=False):
+        """
+        Pull many files' data from the Repository at once. All paths are
+        resolved against the repository tree first, then files are pulled
+        concurrently by a pool of threads. Every thread pulls a chunk of
+        files acquiring all of the chunk files locks at once and pull
+        methods are compiled once for all files sharing the same method.
+
+        :Parameters:
+            #. relativePaths (list): List of files relative to the repository
+               paths.
+            #. pull (None, string): The pulling method used for all files.
+               If None, the pull method saved in every file info will be used.
+            #. workers (int): Number of threads pulling files. If 1, files
+               are pulled in the calling thread.
+            #. chunksize (None, int): Number of files pulled by a thread
+               acquiring their locks at once. If None, it's automatically
+               computed from the number of files and workers.
+            #. generator (boolean): Whether to return a generator yielding
+               pulled data as soon as available rather than a list. In both
+               cases, data is returned in relativePaths order.
+            #. ntrials (int): After aquiring all locks, ntrials is the maximum
+               number of trials allowed before failing.
+               In rare cases, when multiple processes
+               are accessing the same repository components, different processes
+               can alter repository components between successive lock releases
+               of some other process. Bigger number of trials lowers the
+               likelyhood of failure due to multiple processes same time
+               alteration.
+            #. optimistic (boolean): Whether to pull files without acquiring
+               their locks as in pull_file. Files failing after ntrials
+               conflicts are pulled under their locks.
+
+        :Returns:
+            #. data (list, generator): The pulled data from the files.
+        """
+        assert isinstance(relativePaths, (list,tuple)), "relativePaths must be a list"
+        assert isinstance(workers, int), "workers must be integer"
+        assert workers>0, "workers must be >0"
+        assert isinstance(generator, bool), "generator must be boolean"
+        assert isinstance(optimistic, bool), "optimistic must be boolean"
+        assert isinstance(ntrials, int), "ntrials must be integer"
+        assert ntrials>0, "ntrials must be >0"
+        if pull is not None:
+            pull = self.__to_serializer_method(pull, 'pull')
+        # resolve all paths
+        paths = []
+        for relativePath in relativePaths:
+            assert isinstance(relativePath, basestring), "relativePaths list items must be strings"
+            relativePath = self.to_repo_relative_path(path=relativePath, split=False)
+            assert self.__index.is_file(relativePath), "File '%s' is not a repository file"%(relativePath,)
+            paths.append(relativePath)
+        # create chunks
+        if chunksize is None:
+            chunksize = max(1, min(64, len(paths)//(4*workers)))
+        assert isinstance(chunksize, int), "chunksize must be None or integer"
+        assert chunksize>0, "chunksize must be >0"
+        indexed = list(enumerate(paths))
+        chunks  = [indexed[i:i+chunksize] for i in range(0, len(indexed), chunksize)]
+        def pullChunk(chunk):
+            # worker threads and generator consumers run out of pull_files call
+            with repository_operation('pull_files'):
+                return self.__pull_files_chunk(chunk=chunk, pull=pull, ntrials=ntrials, optimistic=optimistic)
+        # pull in order
+        def _pull():
+            if workers == 1 or len(chunks) <= 1:
+                for chunk in chunks:
+                    for _, value in pullChunk(chunk):
+                        yield value
+                return
+            pool = ThreadPool(processes=min(workers, len(chunks)))
+            try:
+                pulled = {}
+                nextIdx = 0
+                for result in pool.imap_unordered(pullChunk, chunks):
+                    pulled.update(result)
+                    while nextIdx in pulled:
+                        yield pulled.pop(nextIdx)
+                        nextIdx += 1
+            finally:
+                pool.terminate()
+        if generator:
+            return _pull()
+        return list(_pull())
+
+
+    @path_required
+    @writable_required
+    @lock_operation
     def rename_file(self, relativePath, newRelativePath,
                           force=False, raiseError=True, ntrials=3):
         """
@@ -2810,28 +5117,50 @@ class Repository(object):
         newRelativePath = self.to_repo_relative_path(path=newRelativePath, split=False)
         newRealPath     = os.path.join(self.__path,newRelativePath)
         nfPath, nfName  = os.path.split(newRealPath)
+        # lock repository
+        acquired, repoLockId = self.__locker.acquire_lock(path=self.__path, timeout=self.timeout)
+        if not acquired:
+            error = "code %s. Unable to aquire the repository lock. You may try again!"%(repoLockId,)
+            assert not raiseError, error
+            return False, error
+        # load repository info
+        for _trial in range(ntrials):
+            try:
+                self.__reload_walk_repo()
+            except Exception as err:
+                error = str(err)
+                self.__failed_trial(_trial, error)
+            else:
+                error = None
+                break
+        if error is not None:
+            self.__locker.release_lock(repoLockId)
+            assert not raiseError, error
+            return False, error
+        # add new file missing directories within the same lock and tree commit
+        newRelDir = os.path.dirname(newRelativePath)
+        if not self.__index.is_directory(newRelDir):
+            error = self.__add_directory(newRelDir, ntrials=ntrials)
+            if error is not None:
+                self.__commit_walk_repo()
+                self.__locker.release_lock(repoLockId)
+                error = "Unable to add directory (%s)"%(error,)
+                assert not raiseError, error
+                return False, error
         # lock old file
         acquired, fileLockId = self.__locker.acquire_lock(path=realPath, timeout=self.timeout)
         if not acquired:
+            self.__commit_walk_repo()
+            self.__locker.release_lock(repoLockId)
             error = "Code %s. Unable to aquire the lock for old file '%s'"%(fileLockId,relativePath)
             assert not raiseError, error
             return False, error
-        # add directory
-        try:
-            success, reason = self.add_directory(nfPath, raiseError=False, ntrials=ntrials)
-        except Exception as err:
-            reason  = "Unable to add directory (%s)"%(str(err))
-            success = False
-        if not success:
-            #LO.release_lock()
-            self.__locker.release_lock(fileLockId)
-            assert not raiseError, reason
-            return False, reason
         # create new file lock
         acquired, newFileLockId = self.__locker.acquire_lock(path=newRealPath, timeout=self.timeout)
         if not acquired:
-            #LO.release_lock()
+            self.__commit_walk_repo()
             self.__locker.release_lock(fileLockId)
+            self.__locker.release_lock(repoLockId)
             error = "Code %s. Unable to aquire the lock for new file path '%s'"%(newFileLockId,newRelativePath)
             assert not raiseError, error
             return False, error
@@ -2849,36 +5178,32 @@ class Repository(object):
                 # get new file path
                 nisRepoFile,nfileOnDisk,ninfoOnDisk,nclassOnDisk = self.is_repository_file(newRelativePath)
                 assert not nisRepoFile or force, "New file path is a registered repository file, set force to True to proceed regardless"
-                # get parent directories list
-                oDirList = self.__get_repository_directory(fPath)
-                nDirList = self.__get_repository_directory(nfPath)
                 # remove new file and all repository files from disk
                 if os.path.isfile(newRealPath):
                     os.remove(newRealPath)
-                if os.path.isfile(os.path.join(nfPath,self.__fileInfo%nfName)):
-                    os.remove(os.path.join(nfPath,self.__fileInfo%nfName))
-                if os.path.isfile(os.path.join(nfPath,self.__fileClass%nfName)):
-                    os.remove(os.path.join(nfPath,self.__fileClass%nfName))
                 # move old file to new path
                 os.rename(realPath, newRealPath)
-                os.rename(os.path.join(fPath,self.__fileInfo%fName), os.path.join(nfPath,self.__fileInfo%nfName))
-                os.rename(os.path.join(fPath,self.__fileClass%fName), os.path.join(nfPath,self.__fileClass%nfName))
+                self.__copy_file_info(relativePath, newRelativePath, move=True)
                 # update list
-                findex = oDirList.index(fName)
-                oDirList.pop(findex)
+                self.__index.remove_file(relativePath)
                 # update new list
-                if nfName not in nDirList:
-                    nDirList.append(nfName)
+                if not nisRepoFile:
+                    self.__index.add_file(newRelativePath)
             except Exception as err:
                 renamed = False
                 error = str(err)
-                if self.DEBUG_PRINT_FAILED_TRIALS: print("Trial %i failed in Repository.%s (%s). Set Repository.DEBUG_PRINT_FAILED_TRIALS to False to mute"%(_trial, inspect.stack()[1][3], str(error)))
+                self.__failed_trial(_trial, error)
             else:
                 renamed = True
                 break
+        # save repository along with any added directory
+        _, cerror = self.__commit_walk_repo()
+        if renamed and cerror is not None:
+            renamed, error = False, cerror
         # release locks
         self.__locker.release_lock(fileLockId)
         self.__locker.release_lock(newFileLockId)
+        self.__locker.release_lock(repoLockId)
         # always clean old file lock
         try:
             if os.path.isfile(os.path.join(fPath,self.__fileLock%fName)):
@@ -2891,6 +5216,8 @@ class Repository(object):
 
 
     @path_required
+    @writable_required
+    @lock_operation
     def remove_file(self, relativePath, removeFromSystem=False,
                           raiseError=True, ntrials=3):
         """
@@ -2942,19 +5269,14 @@ class Repository(object):
                     if classOnDisk:
                         message.append("%s is found on disk"%self.__fileClass%fName)
                 else:
-                    dirList = self.__get_repository_directory(fPath)
-                    findex  = dirList.index(fName)
-                    dirList.pop(findex)
+                    self.__index.remove_file(relativePath)
                     if os.path.isfile(realPath):
                         os.remove(realPath)
-                    if os.path.isfile(os.path.join(fPath,self.__fileInfo%fName)):
-                        os.remove(os.path.join(fPath,self.__fileInfo%fName))
-                    if os.path.isfile(os.path.join(fPath,self.__fileClass%fName)):
-                        os.remove(os.path.join(fPath,self.__fileClass%fName))
+                    self.__remove_file_info(relativePath)
             except Exception as err:
                 removed = False
                 message.append(str(err))
-                if self.DEBUG_PRINT_FAILED_TRIALS: print("Trial %i failed in Repository.%s (%s). Set Repository.DEBUG_PRINT_FAILED_TRIALS to False to mute"%(_trial, inspect.stack()[1][3], '\n'.join(message)))
+                self.__failed_trial(_trial, '\n'.join(message))
             else:
                 removed = True
                 break
@@ -1,12 +1,13 @@
 # standard distribution imports
 from __future__ import print_function
-import sys, os, time, datetime, random
+import sys, os, time, datetime, random, shutil, subprocess
 
 # numpy imports
 import numpy as np
 
 # import Repository
 from pyrep import Repository
+from pyrep.Repository import get_buffers_path, get_buffers_names
 
 # set IGNORE_REP
 IGNORE_DIR_NOT_REP = True
@@ -15,6 +16,201 @@ SLEEP = 0.001
 MODES = ["save_repository","load_repository", "update_string_pickled", "dump_string_pickled"]
 FORCE_MODE = None
 
+# locking modes scaling benchmark.
+# run as 'python multi_processes.py benchmark_locking [nwriters] [nfiles] [size]'
+BENCHMARK_WRITERS = 32
+BENCHMARK_FILES   = 10
+BENCHMARK_SIZE    = 100000
+
+def benchmark_writer(path, lockingMode, index, nfiles, size, start):
+    """dump nfiles arrays in writer own sub directory and print end time"""
+    Repository.LOCKING_MODE = lockingMode
+    rep   = Repository(path)
+    value = np.random.random(size)
+    while time.time()<start:
+        time.sleep(0.001)
+    for idx in range(nfiles):
+        rep.dump_file(value, relativePath='writer_%i/array_%i'%(index,idx), replace=True)
+    print(time.time())
+
+def benchmark_locking(nwriters, nfiles, size):
+    """run nwriters processes dumping into different directories in every
+    locking mode and print the time it takes"""
+    path = os.path.join(os.path.expanduser("~"), 'pyrepTest_benchmark_locking')
+    print("%i writers dumping %i files of %i floats each"%(nwriters, nfiles, size))
+    for lockingMode in ('repository','directory'):
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        rep = Repository()
+        rep.create_repository(path)
+        # writers are started one at a time to connect to the locker
+        # server and wait for the same start time to dump
+        start   = time.time()+2+0.25*nwriters
+        writers = []
+        for idx in range(nwriters):
+            writers.append( subprocess.Popen([sys.executable, __file__, 'benchmark_writer', path,
+                                              lockingMode, str(idx), str(nfiles), str(size), repr(start)],
+                                              stdout=subprocess.PIPE, universal_newlines=True) )
+            time.sleep(0.2)
+        ends = [float(w.communicate()[0].strip().split()[-1]) for w in writers]
+        nstored = Repository(path).get_stats(verify=True)[1]
+        print("%10s locking: %.3f seconds (%s files in repository)"%(lockingMode, max(ends)-start, nstored))
+        rep.remove_repository(removeEmptyDirs=True)
+
+# 'pickle5_oob' buffers sidecars life cycle check.
+# run as 'python multi_processes.py check_buffers [nreplaces]'
+CHECK_REPLACES = 200
+
+def sidecars(path, relativePath):
+    """get a repository file uid named buffers sidecars"""
+    dirPath, name = os.path.split(os.path.join(path, relativePath))
+    return get_buffers_names(name, os.listdir(dirPath) if os.path.isdir(dirPath) else [])
+
+def check_sidecar(rep, relativePath):
+    """assert file has a single sidecar named after its info buffers uid"""
+    uid = rep.get_file_info(relativePath)[0]['buffers']
+    assert sidecars(rep.path, relativePath) == [os.path.basename(get_buffers_path(relativePath, uid))], sidecars(rep.path, relativePath)
+    return uid
+
+def buffers_writer(path, nreplaces):
+    """replace 'replaced' file by constant arrays of increasing values"""
+    rep = Repository(path)
+    for idx in range(nreplaces):
+        rep.dump_file(np.full(2**18, idx, dtype=np.float64), relativePath='replaced', dump='pickle5_oob', replace=True)
+
+def check_buffers(nreplaces):
+    """assert buffers sidecars are replaced, copied, renamed and removed
+    along with their files and that optimistic pulls never mix a file with
+    another file sidecar while another process replaces it"""
+    path = os.path.join(os.path.expanduser("~"), 'pyrepTest_check_buffers')
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    rep = Repository()
+    rep.create_repository(path)
+    # dump and replace
+    rep.dump_file(np.arange(1000.), relativePath='a/array', dump='pickle5_oob')
+    uid = check_sidecar(rep, 'a/array')
+    rep.dump_file(np.arange(2000.), relativePath='a/array', dump='pickle5_oob', replace=True)
+    assert check_sidecar(rep, 'a/array') != uid, "replaced file sidecar must have a new uid"
+    rep.update_file(np.arange(3000.), relativePath='a/array')
+    check_sidecar(rep, 'a/array')
+    assert np.all(rep.pull_file('a/array') == np.arange(3000.))
+    # failing replace keeps former file and sidecar
+    def failing_replace(*args, **kwargs):
+        raise IOError('injected replace failure')
+    module = sys.modules[Repository.__module__]
+    replace, module.atomic_replace = module.atomic_replace, failing_replace
+    try:
+        success, _ = rep.dump_file(np.arange(4000.), relativePath='a/array', dump='pickle5_oob', replace=True, raiseError=False)
+    finally:
+        module.atomic_replace = replace
+    assert not success
+    check_sidecar(rep, 'a/array')
+    assert np.all(rep.pull_file('a/array') == np.arange(3000.))
+    # copy and rename carry sidecar
+    rep.copy_file('a/array', 'b/array')
+    check_sidecar(rep, 'a/array')
+    check_sidecar(rep, 'b/array')
+    rep.rename_file('b/array', 'c/renamed')
+    assert not len(sidecars(path, 'b/array'))
+    check_sidecar(rep, 'c/renamed')
+    assert np.all(rep.pull_file('c/renamed') == np.arange(3000.))
+    rep.copy_directory('c', 'd')
+    check_sidecar(rep, 'd/renamed')
+    # replacing with another serializer removes sidecar
+    rep.dump_file(np.arange(10.), relativePath='d/renamed', dump='numpy', replace=True)
+    assert not len(sidecars(path, 'd/renamed'))
+    # remove file removes sidecar
+    rep.remove_file('a/array')
+    assert not len(sidecars(path, 'a/array'))
+    # optimistic pulls while another process replaces the file
+    rep.dump_file(np.full(2**18, -1, dtype=np.float64), relativePath='replaced', dump='pickle5_oob')
+    writer = subprocess.Popen([sys.executable, __file__, 'buffers_writer', path, str(nreplaces)])
+    npulls = 0
+    while writer.poll() is None:
+        value = rep.pull_file('replaced', optimistic=True)
+        assert value[0] == value[-1], "pulled file mixes two dumped values"
+        npulls += 1
+    assert writer.returncode == 0, "buffers writer failed"
+    assert rep.pull_file('replaced')[0] == nreplaces-1
+    check_sidecar(rep, 'replaced')
+    print("%i optimistic pulls while file was replaced %i times"%(npulls, nreplaces))
+    # remove repository removes all sidecars
+    rep.remove_repository(removeEmptyDirs=True)
+    assert not os.path.isdir(path), "repository directory must be removed"
+    print("buffers sidecars check passed")
+
+# group commit queue check.
+# run as 'python multi_processes.py check_commit_queue [nwriters] [nfiles]'
+CHECK_WRITERS = 8
+CHECK_FILES   = 20
+
+def commit_queue_writer(path, index, nfiles, start):
+    """dump nfiles in 'directory' locking mode into a shared and an own
+    directory"""
+    Repository.LOCKING_MODE = 'directory'
+    Repository.GROUP_COMMIT = True
+    rep = Repository(path)
+    while time.time()<start:
+        time.sleep(0.001)
+    for idx in range(nfiles):
+        rep.dump_file((index,idx), relativePath='shared/writer_%i_%i'%(index,idx))
+        rep.dump_file((index,idx), relativePath='writer_%i/file_%i'%(index,idx))
+
+def check_commit_queue(nwriters, nfiles):
+    """assert all files dumped by concurrent writers committing through
+    the commit queue are tracked and the queue is emptied"""
+    path = os.path.join(os.path.expanduser("~"), 'pyrepTest_check_commit_queue')
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    rep = Repository()
+    rep.create_repository(path)
+    start   = time.time()+2+0.25*nwriters
+    writers = []
+    for idx in range(nwriters):
+        writers.append( subprocess.Popen([sys.executable, __file__, 'commit_queue_writer', path,
+                                          str(idx), str(nfiles), repr(start)]) )
+        time.sleep(0.2)
+    for writer in writers:
+        assert writer.wait() == 0, "commit queue writer failed"
+    rep = Repository(path)
+    for index in range(nwriters):
+        for idx in range(nfiles):
+            assert rep.pull_file('shared/writer_%i_%i'%(index,idx)) == (index,idx)
+            assert rep.pull_file('writer_%i/file_%i'%(index,idx)) == (index,idx)
+    assert len(list(rep.walk_files_path(relativePath='shared'))) == nwriters*nfiles
+    queue = os.path.join(path, '.pyrepcommitqueue')
+    assert not os.path.isdir(queue) or not len(os.listdir(queue)), "commit queue must be empty"
+    success, errors = rep.verify()
+    assert success, errors
+    rep.remove_repository(removeEmptyDirs=True)
+    print("commit queue check passed, %i writers dumped %i files"%(nwriters, 2*nwriters*nfiles))
+
+if len(sys.argv)>1 and sys.argv[1] == 'buffers_writer':
+    buffers_writer(path=sys.argv[2], nreplaces=int(sys.argv[3]))
+    exit()
+if len(sys.argv)>1 and sys.argv[1] == 'check_buffers':
+    check_buffers(*([int(a) for a in sys.argv[2:3]] or [CHECK_REPLACES]))
+    exit()
+if len(sys.argv)>1 and sys.argv[1] == 'commit_queue_writer':
+    commit_queue_writer(path=sys.argv[2], index=int(sys.argv[3]),
+                        nfiles=int(sys.argv[4]), start=float(sys.argv[5]))
+    exit()
+if len(sys.argv)>1 and sys.argv[1] == 'check_commit_queue':
+    args = [int(a) for a in sys.argv[2:4]]
+    args += [CHECK_WRITERS, CHECK_FILES][len(args):]
+    check_commit_queue(*args)
+    exit()
+if len(sys.argv)>1 and sys.argv[1] == 'benchmark_writer':
+    benchmark_writer(path=sys.argv[2], lockingMode=sys.argv[3], index=int(sys.argv[4]),
+                     nfiles=int(sys.argv[5]), size=int(sys.argv[6]), start=float(sys.argv[7]))
+    exit()
+if len(sys.argv)>1 and sys.argv[1] == 'benchmark_locking':
+    args = [int(a) for a in sys.argv[2:5]]
+    args += [BENCHMARK_WRITERS, BENCHMARK_FILES, BENCHMARK_SIZE][len(args):]
+    benchmark_locking(*args)
+    exit()
+
 if len(sys.argv)>1:
     for m in sys.argv[1:]:
         assert m in MODES, "given mode '%s' is not in modes"%(m,)
@@ -0,0 +1,71 @@
+# standard distribution imports
+from __future__ import print_function
+import sys, os, time, shutil
+
+# numpy imports
+import numpy as np
+
+# import Repository
+from pyrep import Repository
+from pyrep.Repository import get_auto_serializer
+
+# default pickle versus automatic serializer benchmark.
+# run as 'python serializers_benchmark.py [repeats]'
+# fsync is disabled to time serialization only
+REPEATS = 5
+SIZE    = 8*1024*1024
+
+VALUES = [('bytes',           lambda: os.urandom(SIZE)),
+          ('bytearray',       lambda: bytearray(os.urandom(SIZE))),
+          ('memoryview',      lambda: memoryview(os.urandom(SIZE))),
+          ('numpy float64',   lambda: np.random.random(SIZE//8)),
+          ('numpy int8',      lambda: np.random.randint(0, 100, SIZE).astype(np.int8)),
+          ('list of floats',  lambda: list(np.random.random(SIZE//64))),
+          ('dict of strings', lambda: dict(('key_%i'%i, 'value_%i'%i) for i in range(SIZE//256)))]
+
+def best_time(func, repeats):
+    """get best time of calling func repeats times"""
+    best = None
+    for _ in range(repeats):
+        tic = time.time()
+        func()
+        t = time.time()-tic
+        if best is None or t<best:
+            best = t
+    return best
+
+def benchmark_serializers(repeats):
+    """dump and pull every value with default and automatic serializer and
+    print a table of best times in milliseconds"""
+    path = os.path.join(os.path.expanduser("~"), 'pyrepTest_serializers_benchmark')
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    rep = Repository(durability='none')
+    rep.create_repository(path)
+    header = "%-16s %-8s %12s %12s %12s %12s %10s %10s"%('type','auto','default dump','auto dump','default pull','auto pull','dump gain','pull gain')
+    print(header)
+    print('-'*len(header))
+    for name, make in VALUES:
+        value = make()
+        times = {}
+        for dump in (None, 'auto'):
+            relativePath = '%s_%s'%(name.replace(' ','_'), dump)
+            try:
+                times[(dump,'dump')] = best_time(lambda: rep.dump_file(value, relativePath, dump=dump, replace=True), repeats)
+                times[(dump,'pull')] = best_time(lambda: rep.pull_file(relativePath), repeats)
+            except Exception:
+                # e.g. memoryview is not pickleable
+                times[(dump,'dump')] = times[(dump,'pull')] = None
+        fmt = lambda t: '%12s'%('failed' if t is None else '%.2f'%(1000*t))
+        gain = lambda k: '%10s'%('-' if None in (times[(None,k)], times[('auto',k)]) else 'x%.1f'%(times[(None,k)]/times[('auto',k)]))
+        print("%-16s %-8s %s %s %s %s %s %s"%(name, get_auto_serializer(value),
+              fmt(times[(None,'dump')]), fmt(times[('auto','dump')]),
+              fmt(times[(None,'pull')]), fmt(times[('auto','pull')]),
+              gain('dump'), gain('pull')))
+    rep.remove_repository(removeEmptyDirs=True)
+
+if __name__ == '__main__':
+    repeats = REPEATS
+    if len(sys.argv)>1:
+        repeats = int(sys.argv[1])
+    benchmark_serializers(repeats)